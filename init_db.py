@@ -1,4 +1,4 @@
-from models.base import get_engine, init_db, get_session
+from models.base import get_engine, init_db, session_scope
 from models.user import User
 from models.contact import Contact
 from models.task import Task
@@ -14,7 +14,6 @@ def create_admin_user(session):
         )
         admin.set_password('admin')  # Default password
         session.add(admin)
-        session.commit()
         print("Created admin user (username: admin, password: admin)")
     else:
         print("Admin user already exists")
@@ -25,9 +24,8 @@ def init_database():
     init_db(engine)
     
     # Create session and admin user
-    session = get_session(engine)
-    create_admin_user(session)
-    session.close()
+    with session_scope(engine) as session:
+        create_admin_user(session)
 
 if __name__ == '__main__':
     init_database()
@@ -1,17 +1,116 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+from contextlib import contextmanager
 import os
+import threading
 
 Base = declarative_base()
 
-def get_engine(path="database.db"):
-    database_url = f"sqlite:///{path}"
-    return create_engine(database_url, echo=True)
+# SQLite pragmas applied to every new pooled connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,  # negative means KiB, so ~64MB
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+_engines = {}
+_session_factories = {}
+_registry_lock = threading.Lock()
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def get_engine(path="database.db", echo=False):
+    """Return the process-wide engine for the given database file"""
+    key = os.path.abspath(path)
+    with _registry_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(
+                f"sqlite:///{path}",
+                echo=echo,
+                pool_size=5,
+                max_overflow=10,
+                pool_pre_ping=False,
+                connect_args={"check_same_thread": False, "timeout": 5},
+            )
+            event.listen(engine, "connect", _apply_pragmas)
+            _engines[key] = engine
+        return engine
 
 def init_db(engine):
+    # Every model module must be imported for create_all to see its table
+    from models import user, contact, task, duplicate, llm_cache, enrichment, chat_message  # noqa: F401
+    from models.migrations import run_migrations
+
     Base.metadata.create_all(engine)
+    run_migrations(engine)
+
+def get_session_factory(engine):
+    """Return the shared thread-local session registry bound to engine"""
+    with _registry_lock:
+        factory = _session_factories.get(engine)
+        if factory is None:
+            factory = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+            _session_factories[engine] = factory
+        return factory
 
 def get_session(engine):
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return get_session_factory(engine)()
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries(engine, limit=None):
+    """Count statements sent to engine; raise AssertionError above limit"""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+    if limit is not None and counter.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {counter.count}:\n"
+            + "\n".join(counter.statements)
+        )
+
+@contextmanager
+def session_scope(engine):
+    """Unit of work: commit on success, roll back on error, always release.
+
+    A scope opened inside another on the same thread joins the outer one:
+    it only flushes, and the outermost scope commits and releases.
+    """
+    factory = get_session_factory(engine)
+    session = factory()
+    depth = session.info.get("scope_depth", 0)
+    session.info["scope_depth"] = depth + 1
+    try:
+        yield session
+        if depth:
+            session.flush()
+        else:
+            session.commit()
+    except Exception:
+        if not depth:
+            session.rollback()
+        raise
+    finally:
+        session.info["scope_depth"] = depth
+        if not depth:
+            factory.remove()
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from .base import Base
+from datetime import datetime
+
+class ChatMessage(Base):
+    """One message of a user's conversation with the AI assistant"""
+    __tablename__ = 'chat_messages'
+    __table_args__ = (
+        # Pages of a conversation are read newest first by id
+        Index('ix_chat_messages_user_conversation', 'user_id', 'conversation_id', 'id'),
+    )
+
+    USER = 'user'
+    ASSISTANT = 'assistant'
+
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(Integer, nullable=False)
+    role = Column(String(20), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Foreign Keys
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
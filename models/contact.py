@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 from datetime import datetime
 
 class Contact(Base):
     __tablename__ = 'contacts'
+    __table_args__ = (
+        Index('ix_contacts_owner_id', 'owner_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     first_name = Column(String(50), nullable=False)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from .base import Base
+from datetime import datetime
+
+class DuplicateCandidate(Base):
+    """A pair of contacts the dedup scan thinks may be the same person"""
+    __tablename__ = 'duplicate_candidates'
+    __table_args__ = (
+        UniqueConstraint('contact_id', 'duplicate_id', name='uq_duplicate_candidates_pair'),
+        Index('ix_duplicate_candidates_owner_status', 'owner_id', 'status'),
+    )
+
+    PENDING = 'pending'
+    DISMISSED = 'dismissed'
+
+    id = Column(Integer, primary_key=True)
+    score = Column(Float, nullable=False)
+    reasons = Column(String(100))
+    status = Column(String(20), nullable=False, default=PENDING)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Foreign Keys, contact_id is always the lower id of the pair
+    owner_id = Column(Integer, ForeignKey('users.id'))
+    contact_id = Column(Integer, ForeignKey('contacts.id'), nullable=False)
+    duplicate_id = Column(Integer, ForeignKey('contacts.id'), nullable=False)
+
+    # Relationships
+    contact = relationship("Contact", foreign_keys=[contact_id])
+    duplicate = relationship("Contact", foreign_keys=[duplicate_id])
@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from .base import Base
+from datetime import datetime
+
+class EnrichmentRun(Base):
+    """A batch job asking the AI the same question about many contacts"""
+    __tablename__ = 'enrichment_runs'
+
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    CANCELLED = 'cancelled'
+
+    id = Column(Integer, primary_key=True)
+    task = Column(String(50), nullable=False)
+    prompt = Column(Text, nullable=False)
+    provider = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    status = Column(String(20), nullable=False, default=RUNNING)
+    total = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    # Foreign Keys
+    owner_id = Column(Integer, ForeignKey('users.id'))
+
+    # Relationships
+    results = relationship("ContactEnrichment", back_populates="run", cascade="all, delete-orphan")
+
+class ContactEnrichment(Base):
+    """The answer for one contact in a run; its presence checkpoints the contact"""
+    __tablename__ = 'contact_enrichments'
+    __table_args__ = (
+        UniqueConstraint('run_id', 'contact_id', name='uq_contact_enrichments_run_contact'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    result = Column(Text)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Foreign Keys
+    run_id = Column(Integer, ForeignKey('enrichment_runs.id'), nullable=False)
+    contact_id = Column(Integer, ForeignKey('contacts.id'), nullable=False)
+
+    # Relationships
+    run = relationship("EnrichmentRun", back_populates="results")
+    contact = relationship("Contact")
@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# In-process data change bus. Subscribers get the set of table names touched
+# by each committed transaction, on the committing thread.
+_subscribers = []
+_lock = threading.Lock()
+_local = threading.local()
+
+def subscribe(callback):
+    with _lock:
+        _subscribers.append(callback)
+
+def unsubscribe(callback):
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+def publish(tables):
+    """Announce committed changes; call directly after writes that bypass the ORM"""
+    tables = frozenset(tables)
+    if not tables:
+        return
+    with _lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        callback(tables)
+
+@contextmanager
+def origin(source):
+    """Tag changes committed on this thread inside the block as made by source"""
+    previous = getattr(_local, "origin", None)
+    _local.origin = source
+    try:
+        yield
+    finally:
+        _local.origin = previous
+
+def current_origin():
+    """What is committing on this thread, as given to origin(); None if untagged"""
+    return getattr(_local, "origin", None)
+
+def mark_changed(session, *tables):
+    """Stage tables changed by Core statements run on session; published on commit"""
+    session.info.setdefault("changed_tables", set()).update(tables)
+
+@event.listens_for(Session, "after_flush")
+def _collect_tables(session, flush_context):
+    tables = session.info.setdefault("changed_tables", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+@event.listens_for(Session, "after_commit")
+def _publish_tables(session):
+    tables = session.info.pop("changed_tables", None)
+    if tables:
+        publish(tables)
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_tables(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("changed_tables", None)
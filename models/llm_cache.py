@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from .base import Base
+from datetime import datetime
+
+class LLMCacheEntry(Base):
+    """A model reply stored under the hash of the request that produced it"""
+    __tablename__ = 'llm_cache'
+    __table_args__ = (
+        Index('ix_llm_cache_last_used_at', 'last_used_at'),
+    )
+
+    key = Column(String(64), primary_key=True)
+    provider = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    response = Column(Text, nullable=False)
+    size = Column(Integer, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
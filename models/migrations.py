@@ -0,0 +1,127 @@
+from sqlalchemy import text
+
+# search_index rowids encode the source row: contacts are id * 2, tasks id * 2 + 1
+SEARCH_INSERT = "INSERT INTO search_index (rowid, title, body, owner_id)"
+CONTACT_SEARCH_ROW = (
+    "{row}.id * 2, "
+    "coalesce({row}.first_name, '') || ' ' || coalesce({row}.last_name, ''), "
+    "coalesce({row}.email, '') || ' ' || coalesce({row}.company, '') || ' ' || "
+    "coalesce({row}.position, '') || ' ' || coalesce({row}.address, '') || ' ' || "
+    "coalesce({row}.notes, ''), "
+    "{row}.owner_id"
+)
+TASK_SEARCH_ROW = (
+    "{row}.id * 2 + 1, coalesce({row}.title, ''), coalesce({row}.description, ''), "
+    "{row}.assigned_to_id"
+)
+# Bulk imports drop this trigger for the length of a batch and index the
+# batch with one INSERT ... SELECT instead
+CONTACT_SEARCH_INSERT_TRIGGER = (
+    "CREATE TRIGGER contacts_search_insert AFTER INSERT ON contacts BEGIN "
+    f"{SEARCH_INSERT} VALUES ({CONTACT_SEARCH_ROW.format(row='new')}); END"
+)
+
+# Ordered schema migrations. Each entry is (version, description, statements);
+# the applied version is tracked in SQLite's PRAGMA user_version. Statements
+# must be idempotent because fresh databases already get the current schema
+# from Base.metadata.create_all.
+MIGRATIONS = [
+    (1, "Index hot filter columns", [
+        "CREATE INDEX IF NOT EXISTS ix_contacts_owner_id ON contacts (owner_id)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_assignee_status_due "
+        "ON tasks (assigned_to_id, status, due_date)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_assignee_due ON tasks (assigned_to_id, due_date)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_assignee_reminder "
+        "ON tasks (assigned_to_id, reminder_date)",
+        "CREATE INDEX IF NOT EXISTS ix_tasks_contact_id ON tasks (contact_id)",
+        "ANALYZE",
+    ]),
+    (2, "Full-text search index over contacts and tasks", [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "title, body, owner_id UNINDEXED, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        "DROP TRIGGER IF EXISTS contacts_search_insert",
+        "DROP TRIGGER IF EXISTS contacts_search_update",
+        "DROP TRIGGER IF EXISTS contacts_search_delete",
+        "DROP TRIGGER IF EXISTS tasks_search_insert",
+        "DROP TRIGGER IF EXISTS tasks_search_update",
+        "DROP TRIGGER IF EXISTS tasks_search_delete",
+        CONTACT_SEARCH_INSERT_TRIGGER,
+        "CREATE TRIGGER contacts_search_update AFTER UPDATE ON contacts BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2; "
+        f"{SEARCH_INSERT} VALUES ({CONTACT_SEARCH_ROW.format(row='new')}); END",
+        "CREATE TRIGGER contacts_search_delete AFTER DELETE ON contacts BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2; END",
+        "CREATE TRIGGER tasks_search_insert AFTER INSERT ON tasks BEGIN "
+        f"{SEARCH_INSERT} VALUES ({TASK_SEARCH_ROW.format(row='new')}); END",
+        "CREATE TRIGGER tasks_search_update AFTER UPDATE ON tasks BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2 + 1; "
+        f"{SEARCH_INSERT} VALUES ({TASK_SEARCH_ROW.format(row='new')}); END",
+        "CREATE TRIGGER tasks_search_delete AFTER DELETE ON tasks BEGIN "
+        "DELETE FROM search_index WHERE rowid = old.id * 2 + 1; END",
+        # Backfill rows that existed before the index
+        "DELETE FROM search_index",
+        f"{SEARCH_INSERT} SELECT {CONTACT_SEARCH_ROW.format(row='contacts')} FROM contacts",
+        f"{SEARCH_INSERT} SELECT {TASK_SEARCH_ROW.format(row='tasks')} FROM tasks",
+    ]),
+]
+
+def get_schema_version(connection):
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+def run_migrations(engine):
+    """Apply every migration newer than the database's user_version"""
+    applied = []
+    with engine.begin() as connection:
+        current = get_schema_version(connection)
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                connection.execute(text(statement))
+            connection.exec_driver_sql(f"PRAGMA user_version={version}")
+            applied.append((version, description))
+    return applied
+
+# Hot queries and the index each one is expected to use
+INDEX_CHECKS = [
+    ("ix_contacts_owner_id",
+     "SELECT count(*) FROM contacts WHERE owner_id = 1"),
+    ("ix_tasks_assignee_status_due",
+     "SELECT count(*) FROM tasks WHERE assigned_to_id = 1 AND status = 'TODO' "
+     "AND due_date < '2024-01-01'"),
+    ("ix_tasks_assignee_due",
+     "SELECT id FROM tasks WHERE assigned_to_id = 1 ORDER BY due_date, id LIMIT 100"),
+    ("ix_tasks_assignee_reminder",
+     "SELECT id FROM tasks WHERE assigned_to_id = 1 AND reminder_date > '2024-01-01' "
+     "ORDER BY reminder_date LIMIT 100"),
+    ("ix_tasks_contact_id",
+     "SELECT id FROM tasks WHERE contact_id = 1"),
+]
+
+def explain_query_plan(connection, statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for a SQL statement"""
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}")
+    return [row[-1] for row in rows]
+
+def check_indexes(engine):
+    """Return (index, plan) pairs for hot queries that do not use their index"""
+    failures = []
+    with engine.connect() as connection:
+        for index_name, statement in INDEX_CHECKS:
+            plan = explain_query_plan(connection, statement)
+            if not any(index_name in line for line in plan):
+                failures.append((index_name, plan))
+    return failures
+
+if __name__ == '__main__':
+    import sys
+    from models.base import get_engine
+
+    engine = get_engine(sys.argv[1] if len(sys.argv) > 1 else "database.db")
+    for version, description in run_migrations(engine):
+        print(f"Applied migration {version}: {description}")
+    failures = check_indexes(engine)
+    for index_name, plan in failures:
+        print(f"Query expected to use {index_name} got plan: {plan}")
+    sys.exit(1 if failures else 0)
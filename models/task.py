@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 from datetime import datetime
@@ -17,6 +17,15 @@ class TaskPriority(enum.Enum):
 
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Dashboard counts filter on assignee + status and range-scan due_date
+        Index('ix_tasks_assignee_status_due', 'assigned_to_id', 'status', 'due_date'),
+        # Task list ordered by due date
+        Index('ix_tasks_assignee_due', 'assigned_to_id', 'due_date'),
+        # Upcoming reminders per user
+        Index('ix_tasks_assignee_reminder', 'assigned_to_id', 'reminder_date'),
+        Index('ix_tasks_contact_id', 'contact_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String(100), nullable=False)
@@ -2,8 +2,16 @@ from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from .base import Base
 import bcrypt
+import os
 from datetime import datetime
 
+# bcrypt cost factor for new hashes; stored hashes with another cost are
+# rehashed on the next successful login
+BCRYPT_ROUNDS = int(os.environ.get("MAOU_BCRYPT_ROUNDS", "12"))
+
+def _as_bytes(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -20,9 +28,14 @@ class User(Base):
     contacts = relationship("Contact", back_populates="owner")
     tasks = relationship("Task", back_populates="assigned_to")
 
-    def set_password(self, password):
-        salt = bcrypt.gensalt()
+    def set_password(self, password, rounds=None):
+        salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
         self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt)
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash)
+        return bcrypt.checkpw(password.encode('utf-8'), _as_bytes(self.password_hash))
+
+    def password_needs_rehash(self, rounds=None):
+        # Hashes look like $2b$12$..., the cost is the second field
+        cost = _as_bytes(self.password_hash).split(b'$')[2]
+        return int(cost) != (rounds or BCRYPT_ROUNDS)
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+import json
+import os
+import threading
+
+PROVIDERS = ["OpenAI", "Ollama", "Custom"]
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+# OpenAI-compatible servers often ignore the key but the client insists on one
+CUSTOM_API_KEY = os.environ.get("MAOU_CUSTOM_API_KEY", "not-needed")
+# Clients kept alive; switching back and forth between settings stays cheap
+MAX_CLIENTS = 8
+SETTINGS_FILE = "ai_settings.json"
+
+_clients = OrderedDict()
+_lock = threading.Lock()
+_endpoints = {}
+
+def load_settings(path=SETTINGS_FILE):
+    """The settings saved from the AI Settings dialog, or OpenAI defaults"""
+    settings = {"provider": "OpenAI", "model": "", "api_key": ""}
+    try:
+        with open(path, "r") as f:
+            settings.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    return settings
+
+def settings_key(settings):
+    return (settings.get("provider", "OpenAI"), settings.get("model", ""), settings.get("api_key", ""))
+
+def openai_client(api_key, base_url=None):
+    """One pooled OpenAI client per endpoint and key.
+
+    Chat clients for different models on the same endpoint share it, so
+    their keep-alive connections are reused across messages and models.
+    """
+    key = (api_key, base_url)
+    with _lock:
+        client = _endpoints.get(key)
+        if client is None:
+            import openai
+            client = _endpoints[key] = openai.OpenAI(api_key=api_key, base_url=base_url)
+        return client
+
+def build_client(settings, max_retries=None):
+    """A chat client for settings; max_retries overrides the OpenAI client's own retries"""
+    provider, model, api_key = settings_key(settings)
+
+    def completions(client):
+        if max_retries is not None:
+            # Same connection pool, different retry policy
+            client = client.with_options(max_retries=max_retries)
+        return client.chat.completions
+
+    if provider == "OpenAI":
+        from langchain_community.chat_models import ChatOpenAI
+        return ChatOpenAI(
+            model_name=model,
+            openai_api_key=api_key,
+            streaming=True,
+            client=completions(openai_client(api_key)),
+        )
+    if provider == "Ollama":
+        from langchain_community.llms import Ollama
+        return Ollama(base_url=api_key or DEFAULT_OLLAMA_URL, model=model)
+    if provider == "Custom":
+        if not api_key:
+            raise ValueError("Set the API endpoint of the custom provider in AI Settings")
+        from langchain_community.chat_models import ChatOpenAI
+        return ChatOpenAI(
+            model_name=model,
+            openai_api_key=CUSTOM_API_KEY,
+            openai_api_base=api_key.rstrip("/"),
+            streaming=True,
+            client=completions(openai_client(CUSTOM_API_KEY, api_key.rstrip("/"))),
+        )
+    raise ValueError(f"Unknown AI provider: {provider}")
+
+def get_client(settings):
+    """Cached chat client for these settings, built on first use"""
+    key = settings_key(settings)
+    with _lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+    client = build_client(settings)
+    with _lock:
+        client = _clients.setdefault(key, client)
+        _clients.move_to_end(key)
+        while len(_clients) > MAX_CLIENTS:
+            _clients.popitem(last=False)
+    return client
+
+def clear_clients():
+    with _lock:
+        _clients.clear()
+        _endpoints.clear()
@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from datetime import datetime
+from sqlalchemy import select
+from models.user import User
+
+# How long a "keep me signed in" token stays valid
+SESSION_TTL_HOURS = float(os.environ.get("MAOU_SESSION_TTL_HOURS", "24"))
+SESSION_FILE = "session.token"
+SECRET_FILE = "session.key"
+
+def authenticate(session, username, password):
+    """Return the user if the password matches, rehashing it at the current cost"""
+    user = session.execute(select(User).where(User.username == username)).scalar()
+    if user is None or not user.is_active or not user.check_password(password):
+        return None
+    if user.password_needs_rehash():
+        user.set_password(password)
+    user.last_login = datetime.utcnow()
+    return user
+
+def _secret(path=SECRET_FILE):
+    """Per-install signing key, created on first use and readable only by the owner"""
+    try:
+        with open(path, "rb") as source:
+            return source.read()
+    except FileNotFoundError:
+        key = secrets.token_bytes(32)
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descriptor, "wb") as target:
+            target.write(key)
+        return key
+
+def _sign(key, payload):
+    return hmac.new(key, payload, hashlib.sha256).hexdigest()
+
+def _fingerprint(key, user):
+    # Changing the password changes the hash, which voids outstanding tokens
+    password_hash = user.password_hash
+    if isinstance(password_hash, str):
+        password_hash = password_hash.encode("utf-8")
+    return _sign(key, password_hash)[:32]
+
+def issue_session_token(user, ttl_hours=SESSION_TTL_HOURS, path=SESSION_FILE, secret_path=SECRET_FILE):
+    key = _secret(secret_path)
+    payload = json.dumps({
+        "user_id": user.id,
+        "expires": time.time() + ttl_hours * 3600,
+        "password": _fingerprint(key, user),
+    }).encode("utf-8")
+    token = f"{base64.urlsafe_b64encode(payload).decode('ascii')}.{_sign(key, payload)}"
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w") as target:
+        target.write(token)
+
+def restore_session(session, path=SESSION_FILE, secret_path=SECRET_FILE):
+    """Return the user of a valid saved token without running bcrypt, else None"""
+    if not os.path.exists(path) or not os.path.exists(secret_path):
+        return None
+    key = _secret(secret_path)
+    try:
+        with open(path) as source:
+            encoded, signature = source.read().strip().split(".")
+        payload = base64.urlsafe_b64decode(encoded)
+        claims = json.loads(payload)
+        user_id, expires, fingerprint = claims["user_id"], claims["expires"], claims["password"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not hmac.compare_digest(signature, _sign(key, payload)) or expires < time.time():
+        return None
+    user = session.get(User, user_id)
+    if user is None or not user.is_active or not hmac.compare_digest(fingerprint, _fingerprint(key, user)):
+        return None
+    user.last_login = datetime.utcnow()
+    return user
+
+def clear_session_token(path=SESSION_FILE):
+    if os.path.exists(path):
+        os.remove(path)
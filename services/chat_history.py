@@ -0,0 +1,49 @@
+from sqlalchemy import func, select
+from models.chat_message import ChatMessage
+
+# Messages read from the database at a time
+PAGE_SIZE = 50
+
+# Pages are keyset queries on (user, conversation, id), so reading one
+# costs the same however long the conversation has grown.
+
+def latest_conversation(session, user_id):
+    """The user's most recent conversation, or None before the first"""
+    return session.execute(
+        select(func.max(ChatMessage.conversation_id)).where(ChatMessage.user_id == user_id)
+    ).scalar()
+
+def add_message(session, user_id, conversation_id, role, content):
+    """Store a message and return its id; conversations exist once their first message is stored"""
+    message = ChatMessage(user_id=user_id, conversation_id=conversation_id, role=role, content=content)
+    session.add(message)
+    session.flush()
+    return message.id
+
+def page(session, user_id, conversation_id, before=None, after=None, limit=PAGE_SIZE):
+    """Up to limit (id, role, content) rows, oldest first.
+
+    The newest messages by default, else the ones just before the
+    message id before or just after the message id after.
+    """
+    query = select(ChatMessage.id, ChatMessage.role, ChatMessage.content).where(
+        ChatMessage.user_id == user_id, ChatMessage.conversation_id == conversation_id
+    )
+    if after is not None:
+        query = query.where(ChatMessage.id > after).order_by(ChatMessage.id)
+    else:
+        if before is not None:
+            query = query.where(ChatMessage.id < before)
+        query = query.order_by(ChatMessage.id.desc())
+    rows = session.execute(query.limit(limit)).all()
+    return rows if after is not None else rows[::-1]
+
+def restore_turns(memory, rows):
+    """Feed the question and reply pairs among rows into a ConversationMemory"""
+    question = None
+    for _, role, content in rows:
+        if role == ChatMessage.USER:
+            question = content
+        elif role == ChatMessage.ASSISTANT and question is not None:
+            memory.add_turn(question, content)
+            question = None
@@ -0,0 +1,107 @@
+import os
+import threading
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+# Tokens of history sent with each message, on top of the new message itself
+MEMORY_TOKENS = int(os.environ.get("MAOU_CHAT_MEMORY_TOKENS", "2000"))
+# Rough count for English text; close enough for budgeting and needs no tokenizer
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain the memory of a conversation between a user and an assistant. "
+    "Merge the earlier summary and the new turns into one concise summary of at "
+    "most {words} words. Keep names, facts, decisions and open questions; drop "
+    "small talk. Reply with the summary only."
+)
+
+SUMMARY_PREFIX = "Summary of the conversation so far: "
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+class ConversationMemory:
+    """History for the AI chat within a fixed token budget.
+
+    The newest turns are sent verbatim in a sliding window. Turns that fall
+    out of it are folded into a rolling summary by the model, once, and the
+    cached summary is sent in their place. A quarter of the budget is held
+    for the summary, so every prompt stays under budget however long the
+    conversation runs.
+    """
+
+    def __init__(self, budget=MEMORY_TOKENS):
+        self.budget = budget
+        self.summary_budget = budget // 4
+        self.window_budget = budget - self.summary_budget
+        self.summary = ""
+        # (question, reply, tokens) not yet folded into the summary
+        self.turns = []
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+
+    def add_turn(self, question, reply):
+        tokens = estimate_tokens(question) + estimate_tokens(reply)
+        with self._lock:
+            self.turns.append((question, reply, tokens))
+
+    def _window_start(self, budget):
+        """Index of the oldest turn that still fits in budget with all newer ones"""
+        used = 0
+        start = len(self.turns)
+        while start > 0 and used + self.turns[start - 1][2] <= budget:
+            start -= 1
+            used += self.turns[start][2]
+        return start
+
+    def messages(self, question):
+        """Prompt for a new question: summary, recent turns, then the question"""
+        with self._lock:
+            history = []
+            if self.summary:
+                history.append(SystemMessage(content=SUMMARY_PREFIX + self.summary))
+            for old_question, reply, _ in self.turns[self._window_start(self.window_budget):]:
+                history.extend([HumanMessage(content=old_question), AIMessage(content=reply)])
+        return history + [HumanMessage(content=question)]
+
+    def needs_compaction(self):
+        with self._lock:
+            return self._window_start(self.window_budget) > 0
+
+    def compact(self, llm):
+        """Fold the turns outside the window into the summary.
+
+        Folds down to half the window so the model is asked for a new
+        summary every few turns rather than on every one. Runs off the GUI
+        thread; turns added meanwhile are left for the next compaction.
+        """
+        with self._lock:
+            count = self._window_start(self.window_budget // 2)
+            if count == 0:
+                return
+            folded = self.turns[:count]
+            summary = self.summary
+        # A single huge turn must not blow up the summary prompt either
+        limit = self.window_budget * CHARS_PER_TOKEN
+        transcript = "\n".join(f"User: {question[:limit]}\nAssistant: {reply[:limit]}"
+                               for question, reply, _ in folded)
+        if summary:
+            transcript = f"Earlier summary: {summary}\n\nNew turns:\n{transcript}"
+        words = self.summary_budget * CHARS_PER_TOKEN // 6
+        result = llm.invoke([
+            SystemMessage(content=SUMMARY_INSTRUCTIONS.format(words=words)),
+            HumanMessage(content=transcript),
+        ])
+        text = str(getattr(result, "content", result)).strip()
+        # Models overshoot word limits; never let the summary outgrow its share
+        text = text[:(self.summary_budget - estimate_tokens(SUMMARY_PREFIX)) * CHARS_PER_TOKEN]
+        with self._lock:
+            if self.summary != summary or self.turns[:count] != folded:
+                # Cleared or compacted meanwhile
+                return
+            self.summary = text
+            del self.turns[:count]
@@ -0,0 +1,134 @@
+from collections import namedtuple
+import csv
+import io
+import os
+from sqlalchemy import func, select, text
+from models import events
+from models.contact import Contact
+from models.migrations import CONTACT_SEARCH_INSERT_TRIGGER, CONTACT_SEARCH_ROW, SEARCH_INSERT
+from services.normalize import normalize_email, normalize_header, normalize_phone
+from services.stats import stats_cache
+from services.typeahead import contact_indexes
+
+IMPORT_FIELDS = ["first_name", "last_name", "email", "phone", "company", "position", "address", "notes"]
+
+# Normalized CSV headers recognised for each contact field
+HEADER_ALIASES = {
+    "first_name": {"firstname", "first", "givenname", "forename"},
+    "last_name": {"lastname", "last", "surname", "familyname"},
+    "email": {"email", "emailaddress", "mail"},
+    "phone": {"phone", "phonenumber", "telephone", "tel", "mobile", "cell"},
+    "company": {"company", "organization", "organisation", "employer"},
+    "position": {"position", "title", "jobtitle", "role"},
+    "address": {"address", "streetaddress", "location"},
+    "notes": {"notes", "note", "comments", "comment"},
+}
+
+ImportResult = namedtuple("ImportResult", ["inserted", "duplicates", "skipped", "cancelled"])
+
+def guess_mapping(headers):
+    """Map contact fields to CSV column positions by header name"""
+    mapping = {}
+    for position, header in enumerate(headers):
+        key = normalize_header(header)
+        for field, aliases in HEADER_ALIASES.items():
+            if field not in mapping and (key in aliases or key == normalize_header(field)):
+                mapping[field] = position
+                break
+    return mapping
+
+def read_headers(path):
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        return next(csv.reader(source), [])
+
+def existing_keys(connection, owner_id):
+    """Normalized emails and phones of the owner's contacts, streamed"""
+    keys = set()
+    result = connection.execution_options(yield_per=10000).execute(
+        select(Contact.email, Contact.phone).where(Contact.owner_id == owner_id)
+    )
+    for email, phone in result:
+        keys.update(key for key in (normalize_email(email), normalize_phone(phone)) if key)
+    return keys
+
+def import_contacts(engine, path, owner_id, mapping=None, progress=None, cancelled=None, batch_size=20000):
+    """Insert contacts from a CSV file, skipping ones already known by email or phone.
+
+    The file is read row by row and inserted batch_size rows at a time with
+    a Core executemany, one transaction per batch. Cancelling keeps the
+    batches already committed. progress is called with (bytes_read,
+    file_size) after each batch.
+    """
+    total_bytes = os.path.getsize(path)
+    inserted = duplicates = skipped = 0
+    was_cancelled = False
+    # Timestamps are set in SQL so executemany has no per-row datetime binds
+    insert = Contact.__table__.insert().values(
+        owner_id=owner_id,
+        created_at=func.current_timestamp(),
+        updated_at=func.current_timestamp(),
+    )
+    with engine.connect() as connection:
+        seen = existing_keys(connection, owner_id)
+        connection.rollback()
+    with open(path, "rb") as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        headers = next(reader, [])
+        if mapping is None:
+            mapping = guess_mapping(headers)
+        columns = [(field, mapping.get(field)) for field in IMPORT_FIELDS]
+        batch = []
+        for row in reader:
+            values = {
+                field: (row[position].strip() or None) if position is not None and position < len(row) else None
+                for field, position in columns
+            }
+            if not values["first_name"] and not values["last_name"]:
+                skipped += 1
+                continue
+            keys = [key for key in (normalize_email(values["email"]), normalize_phone(values["phone"])) if key]
+            if any(key in seen for key in keys):
+                duplicates += 1
+                continue
+            seen.update(keys)
+            values["first_name"] = values["first_name"] or ""
+            values["last_name"] = values["last_name"] or ""
+            batch.append(values)
+            if len(batch) >= batch_size:
+                inserted += _insert_batch(engine, insert, batch)
+                batch = []
+                if progress:
+                    progress(raw.tell(), total_bytes)
+                if cancelled and cancelled():
+                    was_cancelled = True
+                    break
+        if batch and not was_cancelled:
+            inserted += _insert_batch(engine, insert, batch)
+    if progress and not was_cancelled:
+        progress(total_bytes, total_bytes)
+    if inserted:
+        # Core inserts bypass the ORM events that keep these current
+        stats_cache.invalidate(owner_id)
+        contact_indexes.invalidate(owner_id)
+        events.publish({"contacts"})
+    return ImportResult(inserted, duplicates, skipped, was_cancelled)
+
+def _insert_batch(engine, insert, rows):
+    with engine.begin() as connection:
+        # A per-row trigger insert into the FTS index costs more than the
+        # contact row itself, so index the whole batch in one statement.
+        # pysqlite only opens its implicit transaction before DML and would
+        # autocommit the DROP, so take the write lock explicitly first: no
+        # other writer can insert contacts while the trigger is missing, and
+        # a rollback restores it.
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        connection.execute(text("DROP TRIGGER IF EXISTS contacts_search_insert"))
+        last_id = connection.execute(select(func.max(Contact.id))).scalar() or 0
+        connection.execute(insert, rows)
+        connection.execute(
+            text(f"{SEARCH_INSERT} SELECT {CONTACT_SEARCH_ROW.format(row='contacts')} "
+                 "FROM contacts WHERE id > :last_id"),
+            {"last_id": last_id},
+        )
+        connection.execute(text(CONTACT_SEARCH_INSERT_TRIGGER))
+    return len(rows)
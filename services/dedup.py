@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import aliased
+from models import events
+from models.contact import Contact
+from models.duplicate import DuplicateCandidate
+from models.task import Task
+from services.normalize import e164_phone, email_key, soundex
+from services.typeahead import normalize, trigrams
+
+# Blocks bigger than this are too generic to say anything (a shared office
+# phone, a very common name) and would cost a quadratic number of pairs
+MAX_BLOCK_SIZE = 200
+BLOCKING_KEYS = ["email_key", "phone_key", "name_key"]
+
+# Evidence weights; a pair scoring at least REVIEW_THRESHOLD is queued
+WEIGHTS = {"email": 0.5, "phone": 0.4, "name": 0.4, "company": 0.15}
+REVIEW_THRESHOLD = 0.5
+
+CONTACT_COLUMNS = ["id", "first_name", "last_name", "email", "phone", "company"]
+
+def load_contacts(session, owner_id):
+    rows = session.execute(
+        select(*(getattr(Contact, column) for column in CONTACT_COLUMNS))
+        .where(Contact.owner_id == owner_id)
+        .order_by(Contact.id)
+    ).all()
+    return pd.DataFrame(rows, columns=CONTACT_COLUMNS)
+
+def _map_distinct(series, fn):
+    """Apply fn once per distinct value; names and companies repeat a lot"""
+    values = series.dropna().unique()
+    return series.map(dict(zip(values, map(fn, values))))
+
+def add_blocking_keys(frame):
+    """Add the normalized columns that blocking and scoring compare"""
+    frame = frame.copy()
+    full_names = _map_distinct(frame["first_name"].fillna("") + " " + frame["last_name"].fillna(""), normalize)
+    frame["full_name"] = full_names.replace("", None)
+    frame["email_key"] = _map_distinct(frame["email"], email_key)
+    frame["phone_key"] = _map_distinct(frame["phone"], e164_phone)
+    first = _map_distinct(frame["first_name"], soundex)
+    last = _map_distinct(frame["last_name"], soundex)
+    frame["name_key"] = (first + last).where(first.notna() & last.notna(), None)
+    frame["company_key"] = _map_distinct(frame["company"], normalize).replace("", None)
+    return frame
+
+def candidate_pairs(frame, keys=BLOCKING_KEYS, max_block_size=MAX_BLOCK_SIZE):
+    """Row positions (left, right) of every pair sharing at least one blocking key"""
+    pairs = []
+    positions = pd.RangeIndex(len(frame), name="position")
+    for key in keys:
+        block = pd.DataFrame({"position": positions, "key": frame[key].to_numpy()}).dropna()
+        sizes = block.groupby("key")["key"].transform("size")
+        block = block[(sizes > 1) & (sizes <= max_block_size)]
+        if block.empty:
+            continue
+        joined = block.merge(block, on="key", suffixes=("_left", "_right"))
+        joined = joined[joined["position_left"] < joined["position_right"]]
+        pairs.append(joined[["position_left", "position_right"]].to_numpy())
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+def _equal(column, left, right):
+    values = column.to_numpy(dtype=object)
+    present = column.notna().to_numpy()
+    return present[left] & present[right] & (values[left] == values[right])
+
+def score_pairs(frame, pairs):
+    """Score candidate pairs; returns a frame sorted by descending score"""
+    left, right = pairs[:, 0], pairs[:, 1]
+    email = _equal(frame["email_key"], left, right)
+    phone = _equal(frame["phone_key"], left, right)
+    company = _equal(frame["company_key"], left, right)
+    # Name similarity is trigram overlap; only candidate pairs are compared
+    names = frame["full_name"].to_numpy(dtype=object)
+    grams = {position: trigrams(names[position]) if names[position] else set()
+             for position in np.unique(pairs)}
+    name = np.fromiter(
+        (len(grams[a] & grams[b]) / (len(grams[a] | grams[b]) or 1) for a, b in zip(left, right)),
+        dtype=float, count=len(left),
+    )
+    score = np.minimum(
+        1.0,
+        WEIGHTS["email"] * email + WEIGHTS["phone"] * phone
+        + WEIGHTS["name"] * name + WEIGHTS["company"] * company,
+    )
+    ids = frame["id"].to_numpy()
+    result = pd.DataFrame({
+        "contact_id": ids[left],
+        "duplicate_id": ids[right],
+        "score": score.round(3),
+        "email": email,
+        "phone": phone,
+        "name": name >= 0.6,
+        "company": company,
+    })
+    return result.sort_values("score", ascending=False, kind="stable").reset_index(drop=True)
+
+def reasons(row):
+    return ", ".join(reason for reason in ("email", "phone", "name", "company") if row[reason])
+
+def find_duplicates(session, owner_id, threshold=REVIEW_THRESHOLD):
+    frame = add_blocking_keys(load_contacts(session, owner_id))
+    scored = score_pairs(frame, candidate_pairs(frame))
+    return scored[scored["score"] >= threshold]
+
+def refresh_candidates(session, owner_id, threshold=REVIEW_THRESHOLD):
+    """Rescan the owner's contacts and rebuild the pending review queue.
+
+    Pairs the user already dismissed stay dismissed. Returns the number of
+    pending candidates.
+    """
+    found = find_duplicates(session, owner_id, threshold)
+    dismissed = set(session.execute(
+        select(DuplicateCandidate.contact_id, DuplicateCandidate.duplicate_id)
+        .where(DuplicateCandidate.owner_id == owner_id,
+               DuplicateCandidate.status == DuplicateCandidate.DISMISSED)
+    ).tuples())
+    session.execute(
+        delete(DuplicateCandidate)
+        .where(DuplicateCandidate.owner_id == owner_id,
+               DuplicateCandidate.status == DuplicateCandidate.PENDING)
+    )
+    rows = [
+        {
+            "owner_id": owner_id,
+            "contact_id": int(row.contact_id),
+            "duplicate_id": int(row.duplicate_id),
+            "score": float(row.score),
+            "reasons": reasons(row._asdict()),
+            "status": DuplicateCandidate.PENDING,
+        }
+        for row in found.itertuples(index=False)
+        if (row.contact_id, row.duplicate_id) not in dismissed
+    ]
+    if rows:
+        session.execute(DuplicateCandidate.__table__.insert(), rows)
+    return len(rows)
+
+def pending_candidates(session, owner_id, limit=500):
+    """Pending pairs with both contacts loaded, best matches first"""
+    contact = aliased(Contact)
+    duplicate = aliased(Contact)
+    return session.execute(
+        select(DuplicateCandidate, contact, duplicate)
+        .join(contact, DuplicateCandidate.contact_id == contact.id)
+        .join(duplicate, DuplicateCandidate.duplicate_id == duplicate.id)
+        .where(DuplicateCandidate.owner_id == owner_id,
+               DuplicateCandidate.status == DuplicateCandidate.PENDING)
+        .order_by(DuplicateCandidate.score.desc(), DuplicateCandidate.id)
+        .limit(limit)
+    ).all()
+
+def dismiss_candidate(session, candidate_id):
+    session.execute(
+        update(DuplicateCandidate)
+        .where(DuplicateCandidate.id == candidate_id)
+        .values(status=DuplicateCandidate.DISMISSED)
+    )
+
+MERGE_FIELDS = ["email", "phone", "company", "position", "address", "notes"]
+
+def merge_contacts(session, keep_id, duplicate_ids):
+    """Fold duplicate contacts into keep_id.
+
+    Empty fields on the kept contact are filled from the duplicates, every
+    task pointing at a duplicate is re-pointed with one UPDATE, and the
+    duplicates are deleted.
+    """
+    duplicate_ids = [contact_id for contact_id in duplicate_ids if contact_id != keep_id]
+    if not duplicate_ids:
+        return 0
+    keep = session.get(Contact, keep_id)
+    duplicates = session.scalars(
+        select(Contact).where(Contact.id.in_(duplicate_ids)).order_by(Contact.id)
+    ).all()
+    for duplicate in duplicates:
+        for field in MERGE_FIELDS:
+            if not getattr(keep, field) and getattr(duplicate, field):
+                setattr(keep, field, getattr(duplicate, field))
+    moved = session.execute(
+        update(Task)
+        .where(Task.contact_id.in_(duplicate_ids))
+        .values(contact_id=keep_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if moved:
+        events.mark_changed(session, "tasks")
+    session.execute(
+        delete(DuplicateCandidate)
+        .where(or_(DuplicateCandidate.contact_id.in_(duplicate_ids),
+                   DuplicateCandidate.duplicate_id.in_(duplicate_ids)))
+    )
+    for duplicate in duplicates:
+        session.delete(duplicate)
+    return moved
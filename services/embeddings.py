@@ -0,0 +1,72 @@
+from functools import lru_cache
+import hashlib
+import os
+import numpy as np
+from services.typeahead import normalize
+
+# Which embedder backs the chat's record search: "hashing" or "ollama"
+EMBEDDER = os.environ.get("MAOU_EMBEDDER", "hashing")
+EMBED_MODEL = os.environ.get("MAOU_EMBED_MODEL", "nomic-embed-text")
+OLLAMA_URL = os.environ.get("MAOU_OLLAMA_URL", "http://localhost:11434")
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+class HashingEmbedder:
+    """Deterministic bag of words and trigrams hashed into dim buckets.
+
+    Needs no model or network, so search works offline and in tests. It
+    matches shared words and near spellings rather than meaning.
+    """
+    TRIGRAM_WEIGHT = 0.5
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._bucket = lru_cache(maxsize=200000)(self._hash)
+
+    def _hash(self, feature):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        # The sign bit keeps colliding features from only ever adding up
+        return digest % self.dim, 1.0 if digest >> 63 else -1.0
+
+    def features(self, text):
+        for word in normalize(text).split():
+            yield word, 1.0
+            padded = f" {word} "
+            for start in range(len(padded) - 2):
+                yield "#" + padded[start:start + 3], self.TRIGRAM_WEIGHT
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self.features(text):
+                bucket, sign = self._bucket(feature)
+                vectors[row, bucket] += sign * weight
+        return normalize_rows(vectors)
+
+class OllamaEmbedder:
+    """Embeddings from a local Ollama server over one keep-alive session"""
+
+    def __init__(self, base_url=OLLAMA_URL, model=EMBED_MODEL, timeout=60):
+        import requests
+        self.url = f"{base_url.rstrip('/')}/api/embeddings"
+        self.model = model
+        self.name = f"ollama-{model}"
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def embed(self, texts):
+        vectors = []
+        for text in texts:
+            response = self.session.post(self.url, json={"model": self.model, "prompt": text}, timeout=self.timeout)
+            response.raise_for_status()
+            vectors.append(response.json()["embedding"])
+        return normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+def default_embedder():
+    if EMBEDDER == "ollama":
+        return OllamaEmbedder()
+    return HashingEmbedder()
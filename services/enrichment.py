@@ -0,0 +1,296 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+import random
+import threading
+import time
+from sqlalchemy import and_, delete, exists, func, or_, select, update
+from langchain_core.messages import HumanMessage
+from models.base import session_scope
+from models.contact import Contact
+from models.enrichment import ContactEnrichment, EnrichmentRun
+
+TASKS = {
+    "classify": (
+        "Classify this CRM contact as exactly one of: Lead, Customer, Partner, "
+        "Vendor, Other. Reply with the label only.\n\n{contact}"
+    ),
+    "summarize": "Summarize what we know about this CRM contact in one sentence.\n\n{contact}",
+    "tag": (
+        "Suggest up to five short tags for this CRM contact, such as industry or "
+        "interests. Reply with the tags separated by commas.\n\n{contact}"
+    ),
+}
+
+CONCURRENCY = 4
+PAGE_SIZE = 500
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+
+class RateLimiter:
+    """Token bucket shared by the workers: rate requests per second, bursting to burst"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancelled=None):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_seconds = (1 - self.tokens) / self.rate
+            if cancelled and cancelled.wait(wait_seconds):
+                raise EnrichmentCancelled()
+            if not cancelled:
+                time.sleep(wait_seconds)
+
+class EnrichmentCancelled(Exception):
+    pass
+
+def contact_prompt(contact):
+    lines = [f"Name: {contact.first_name} {contact.last_name}"]
+    for label, value in (("Company", contact.company), ("Position", contact.position), ("Notes", contact.notes)):
+        if value:
+            lines.append(f"{label}: {value}")
+    return "\n".join(lines)
+
+def create_run(session, owner_id, task, provider, model, prompt=None):
+    """Start a run of task (or a custom prompt containing {contact}) over the owner's contacts"""
+    prompt = prompt or TASKS[task]
+    if "{contact}" not in prompt:
+        raise ValueError("The prompt must contain {contact}")
+    run = EnrichmentRun(owner_id=owner_id, task=task, prompt=prompt, provider=provider, model=model)
+    session.add(run)
+    session.flush()
+    return run
+
+def _pending(run):
+    """Contacts of the run's owner with something to go on and no result yet"""
+    return (
+        select(Contact.id, Contact.first_name, Contact.last_name, Contact.company,
+               Contact.position, Contact.notes)
+        .where(
+            Contact.owner_id == run.owner_id,
+            or_(Contact.notes.isnot(None), Contact.company.isnot(None)),
+            ~exists().where(and_(ContactEnrichment.run_id == run.id,
+                                 ContactEnrichment.contact_id == Contact.id)),
+        )
+        .order_by(Contact.id)
+    )
+
+def _pages(engine, run, page_size):
+    after = 0
+    while True:
+        with session_scope(engine) as session:
+            page = session.execute(_pending(run).where(Contact.id > after).limit(page_size)).all()
+        if not page:
+            return
+        yield from page
+        after = page[-1].id
+
+def _ask(llm, prompt, limiter, cancelled, max_attempts):
+    """Call the model with retries; returns (result, error, attempts)"""
+    for attempt in range(1, max_attempts + 1):
+        if cancelled.is_set():
+            raise EnrichmentCancelled()
+        if limiter:
+            limiter.acquire(cancelled)
+        try:
+            result = llm.invoke([HumanMessage(content=prompt)])
+            return str(getattr(result, "content", result)).strip(), None, attempt
+        except Exception as error:
+            if attempt == max_attempts:
+                return None, f"{type(error).__name__}: {error}", attempt
+            # Exponential backoff with jitter so workers do not retry in lockstep
+            delay = min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** (attempt - 1))
+            if cancelled.wait(delay * random.uniform(0.5, 1.0)):
+                raise EnrichmentCancelled()
+
+def _write(engine, run_id, rows):
+    with session_scope(engine) as session:
+        session.execute(ContactEnrichment.__table__.insert(), rows)
+        session.execute(
+            update(EnrichmentRun)
+            .where(EnrichmentRun.id == run_id)
+            .values(succeeded=EnrichmentRun.succeeded + sum(1 for row in rows if row["error"] is None),
+                    failed=EnrichmentRun.failed + sum(1 for row in rows if row["error"] is not None))
+        )
+
+def run_enrichment(engine, run_id, llm, concurrency=CONCURRENCY, rate=None, max_attempts=MAX_ATTEMPTS,
+                   batch_size=BATCH_SIZE, page_size=PAGE_SIZE, progress=None, cancelled=None,
+                   retry_failed=False):
+    """Run or resume a run; returns the run's (succeeded, failed) totals.
+
+    At most concurrency requests are in flight, and with rate set no more
+    than rate start per second. Failed requests are retried with backoff
+    up to max_attempts. Results are committed batch_size at a time; each
+    stored result is the checkpoint for its contact, so resuming after a
+    crash or cancel only asks about contacts without one. retry_failed
+    discards failed results first so their contacts are asked again.
+    progress is called with (done, total); setting the cancelled event
+    stops the run after the requests in flight.
+    """
+    cancelled = cancelled or threading.Event()
+    with session_scope(engine) as session:
+        run = session.get(EnrichmentRun, run_id)
+        if retry_failed:
+            session.execute(delete(ContactEnrichment).where(ContactEnrichment.run_id == run_id,
+                                                            ContactEnrichment.error.isnot(None)))
+            run.failed = 0
+        done = session.execute(
+            select(func.count()).select_from(ContactEnrichment).where(ContactEnrichment.run_id == run_id)
+        ).scalar()
+        run.total = done + session.execute(select(func.count()).select_from(_pending(run).subquery())).scalar()
+        run.status = EnrichmentRun.RUNNING
+        run.finished_at = None
+        total = run.total
+    limiter = RateLimiter(rate, burst=concurrency) if rate else None
+    contacts = _pages(engine, run, page_size)
+    prompt = run.prompt
+    buffer = []
+    in_flight = {}
+    exhausted = False
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while True:
+                    # Keep the pool busy without queueing every contact up front
+                    while not exhausted and not cancelled.is_set() and len(in_flight) < concurrency * 2:
+                        contact = next(contacts, None)
+                        if contact is None:
+                            exhausted = True
+                            break
+                        text = prompt.replace("{contact}", contact_prompt(contact))
+                        in_flight[executor.submit(_ask, llm, text, limiter, cancelled, max_attempts)] = contact.id
+                    if not in_flight:
+                        break
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        contact_id = in_flight.pop(future)
+                        try:
+                            result, error, attempts = future.result()
+                        except EnrichmentCancelled:
+                            continue
+                        buffer.append({"run_id": run_id, "contact_id": contact_id, "result": result,
+                                       "error": error, "attempts": attempts, "created_at": datetime.utcnow()})
+                        done += 1
+                    if len(buffer) >= batch_size:
+                        _write(engine, run_id, buffer)
+                        buffer = []
+                    if progress:
+                        progress(done, total)
+            except BaseException:
+                # Ctrl+C or a database error; stop the workers from retrying
+                cancelled.set()
+                raise
+    finally:
+        # Finished answers are kept even when the run dies half way
+        if buffer:
+            _write(engine, run_id, buffer)
+        with session_scope(engine) as session:
+            run = session.get(EnrichmentRun, run_id)
+            if cancelled.is_set():
+                run.status = EnrichmentRun.CANCELLED
+            elif done >= total:
+                run.status = EnrichmentRun.COMPLETED
+                run.finished_at = datetime.utcnow()
+            totals = (run.succeeded, run.failed)
+    return totals
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    from models.base import get_engine, init_db
+    from models.user import User
+    from services.ai_providers import build_client, load_settings
+
+    parser = argparse.ArgumentParser(description="Ask the AI about many contacts at once")
+    parser.add_argument("--database", default="database.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    start = commands.add_parser("start", help="start a new run")
+    start.add_argument("task", choices=sorted(TASKS) + ["custom"])
+    start.add_argument("--user", required=True, help="enrich this user's contacts")
+    start.add_argument("--prompt", help="custom prompt, {contact} is replaced by the contact's details")
+    resume = commands.add_parser("resume", help="continue an unfinished run")
+    resume.add_argument("run_id", type=int)
+    resume.add_argument("--retry-failed", action="store_true", help="ask again about contacts that failed")
+    for command in (start, resume):
+        default = "the run's" if command is resume else "the AI Settings choice"
+        command.add_argument("--provider", help=f"AI provider, defaults to {default}")
+        command.add_argument("--model", help=f"defaults to {default}")
+        command.add_argument("--endpoint", help="API key, Ollama URL or Custom endpoint")
+        command.add_argument("--concurrency", type=int, default=CONCURRENCY)
+        command.add_argument("--rate", type=float, help="requests started per second")
+        command.add_argument("--attempts", type=int, default=MAX_ATTEMPTS)
+    commands.add_parser("list", help="show runs")
+    args = parser.parse_args()
+
+    engine = get_engine(args.database)
+    init_db(engine)
+    if args.command == "list":
+        with session_scope(engine) as session:
+            for run in session.scalars(select(EnrichmentRun).order_by(EnrichmentRun.id)):
+                print(f"{run.id:4} {run.task:10} {run.status:10} {run.succeeded}/{run.total} done, "
+                      f"{run.failed} failed  {run.provider} {run.model}")
+        sys.exit(0)
+
+    settings = load_settings()
+    saved_provider = settings["provider"]
+    for name, value in (("provider", args.provider), ("model", args.model), ("api_key", args.endpoint)):
+        if value:
+            settings[name] = value
+
+    def check_endpoint():
+        # The saved key or URL belongs to the provider chosen in AI Settings
+        if settings["provider"] != saved_provider and not args.endpoint:
+            parser.error(f"{settings['provider']} needs --endpoint, the AI Settings are for {saved_provider}")
+
+    with session_scope(engine) as session:
+        if args.command == "start":
+            if args.task == "custom" and not args.prompt:
+                parser.error("custom needs --prompt")
+            check_endpoint()
+            owner_id = session.execute(select(User.id).where(User.username == args.user)).scalar()
+            if owner_id is None:
+                parser.error(f"No user named {args.user}")
+            try:
+                run_id = create_run(session, owner_id, args.task, settings["provider"], settings["model"],
+                                    args.prompt).id
+            except ValueError as error:
+                parser.error(str(error))
+        else:
+            run = session.get(EnrichmentRun, args.run_id)
+            if run is None:
+                parser.error(f"No run {args.run_id}")
+            run_id = run.id
+            # Explicit flags win; otherwise keep asking the model the run started with
+            settings["provider"] = args.provider or run.provider
+            settings["model"] = args.model or run.model
+            check_endpoint()
+            # Record what answers from here on come from
+            run.provider, run.model = settings["provider"], settings["model"]
+
+    def report(done, total):
+        print(f"\r{done}/{total} contacts", end="", file=sys.stderr, flush=True)
+
+    cancel = threading.Event()
+    try:
+        succeeded, failed = run_enrichment(
+            engine, run_id, build_client(settings, max_retries=0), concurrency=args.concurrency, rate=args.rate,
+            max_attempts=args.attempts, progress=report, cancelled=cancel,
+            retry_failed=getattr(args, "retry_failed", False),
+        )
+    except KeyboardInterrupt:
+        cancel.set()
+        print(f"\nStopped; continue with: python -m services.enrichment resume {run_id}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nRun {run_id}: {succeeded} succeeded, {failed} failed", file=sys.stderr)
@@ -0,0 +1,173 @@
+from collections import namedtuple
+from datetime import datetime
+import csv
+import enum
+import os
+from sqlalchemy import func, select
+from models.contact import Contact
+from models.task import Task, TaskStatus
+
+ExportColumn = namedtuple("ExportColumn", ["header", "expression"])
+
+class ExportCancelled(Exception):
+    pass
+
+class ExportSpec:
+    """What one entity exports: its columns, owner and date filter columns and row order"""
+
+    def __init__(self, entity, columns, owner_column, date_column, order_by, joins=()):
+        self.entity = entity
+        self.columns = columns
+        self.owner_column = owner_column
+        self.date_column = date_column
+        self.order_by = order_by
+        self.joins = joins
+
+EXPORTS = {
+    "contacts": ExportSpec(
+        Contact,
+        {
+            "id": ExportColumn("ID", Contact.id),
+            "first_name": ExportColumn("First Name", Contact.first_name),
+            "last_name": ExportColumn("Last Name", Contact.last_name),
+            "email": ExportColumn("Email", Contact.email),
+            "phone": ExportColumn("Phone", Contact.phone),
+            "company": ExportColumn("Company", Contact.company),
+            "position": ExportColumn("Position", Contact.position),
+            "address": ExportColumn("Address", Contact.address),
+            "notes": ExportColumn("Notes", Contact.notes),
+            "created_at": ExportColumn("Created", Contact.created_at),
+            "updated_at": ExportColumn("Updated", Contact.updated_at),
+        },
+        owner_column=Contact.owner_id,
+        date_column=Contact.created_at,
+        # Walks ix_contacts_owner_id in order, no sort step
+        order_by=(Contact.id,),
+    ),
+    "tasks": ExportSpec(
+        Task,
+        {
+            "id": ExportColumn("ID", Task.id),
+            "title": ExportColumn("Title", Task.title),
+            "description": ExportColumn("Description", Task.description),
+            "status": ExportColumn("Status", Task.status),
+            "priority": ExportColumn("Priority", Task.priority),
+            "due_date": ExportColumn("Due Date", Task.due_date),
+            "reminder_date": ExportColumn("Reminder", Task.reminder_date),
+            "contact": ExportColumn("Contact", Contact.first_name + " " + Contact.last_name),
+            "created_at": ExportColumn("Created", Task.created_at),
+            "completed_at": ExportColumn("Completed", Task.completed_at),
+        },
+        owner_column=Task.assigned_to_id,
+        date_column=Task.due_date,
+        # Same order as the task list, served by ix_tasks_assignee_due
+        order_by=(Task.due_date, Task.id),
+        joins=((Contact, Task.contact_id == Contact.id),),
+    ),
+}
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+def export_query(kind, columns=None, owner_id=None, statuses=None, since=None, until=None):
+    """Select the chosen columns with the filters applied, in export order"""
+    spec = EXPORTS[kind]
+    names = list(columns or spec.columns)
+    unknown = [name for name in names if name not in spec.columns]
+    if unknown:
+        raise ValueError(f"Unknown {kind} columns: {', '.join(unknown)}")
+    query = select(*(spec.columns[name].expression for name in names)).select_from(spec.entity)
+    for target, onclause in spec.joins:
+        query = query.outerjoin(target, onclause)
+    if owner_id is not None:
+        query = query.where(spec.owner_column == owner_id)
+    if statuses:
+        if spec.entity is not Task:
+            raise ValueError("Status filter only applies to tasks")
+        query = query.where(Task.status.in_(statuses))
+    if since is not None:
+        query = query.where(spec.date_column >= since)
+    if until is not None:
+        query = query.where(spec.date_column < until)
+    return names, query.order_by(*spec.order_by)
+
+def export_csv(session, kind, path, columns=None, owner_id=None, statuses=None,
+               since=None, until=None, progress=None, cancelled=None, chunk_size=2000):
+    """Stream rows into a CSV file and return how many were written.
+
+    Rows are fetched chunk_size at a time and written straight out, so
+    memory use does not grow with the table. The file is written under a
+    temporary name and only renamed into place once complete. progress is
+    called with (rows_written, total); when cancelled() returns true the
+    partial file is removed and ExportCancelled is raised.
+    """
+    names, query = export_query(kind, columns, owner_id, statuses, since, until)
+    total = session.execute(select(func.count()).select_from(query.order_by(None).subquery())).scalar()
+    spec = EXPORTS[kind]
+    partial = f"{path}.part"
+    written = 0
+    try:
+        with open(partial, "w", newline="", encoding="utf-8", buffering=1024 * 1024) as output:
+            writer = csv.writer(output)
+            writer.writerow([spec.columns[name].header for name in names])
+            result = session.execute(query.execution_options(yield_per=chunk_size))
+            for rows in result.partitions():
+                if cancelled and cancelled():
+                    raise ExportCancelled()
+                writer.writerows([format_value(value) for value in row] for row in rows)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return written
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d")
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    from models.base import get_engine, session_scope
+    from models.user import User
+
+    parser = argparse.ArgumentParser(description="Export contacts or tasks to CSV")
+    parser.add_argument("kind", choices=sorted(EXPORTS))
+    parser.add_argument("path")
+    parser.add_argument("--database", default="database.db")
+    parser.add_argument("--user", help="only export records owned by or assigned to this username")
+    parser.add_argument("--columns", help="comma separated column names")
+    parser.add_argument("--status", action="append", choices=[status.name for status in TaskStatus],
+                        help="task status to include, may be repeated")
+    parser.add_argument("--since", type=parse_date, help="YYYY-MM-DD, on or after (due date for tasks, created for contacts)")
+    parser.add_argument("--until", type=parse_date, help="YYYY-MM-DD, before")
+    args = parser.parse_args()
+
+    def report(done, total):
+        print(f"\r{done}/{total} rows", end="", file=sys.stderr, flush=True)
+
+    with session_scope(get_engine(args.database)) as session:
+        owner_id = None
+        if args.user:
+            owner_id = session.execute(select(User.id).where(User.username == args.user)).scalar()
+            if owner_id is None:
+                parser.error(f"No user named {args.user}")
+        count = export_csv(
+            session, args.kind, args.path,
+            columns=args.columns.split(",") if args.columns else None,
+            owner_id=owner_id,
+            statuses=[TaskStatus[name] for name in args.status] if args.status else None,
+            since=args.since,
+            until=args.until,
+            progress=report,
+        )
+    print(f"\nExported {count} {args.kind} to {args.path}", file=sys.stderr)
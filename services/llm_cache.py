@@ -0,0 +1,159 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+import threading
+from sqlalchemy import delete, func, select, update
+from models.base import session_scope
+from models.llm_cache import LLMCacheEntry
+
+# Replies older than this are asked again; answers about "now" go stale
+CACHE_TTL_HOURS = float(os.environ.get("MAOU_LLM_CACHE_TTL_HOURS", "168"))
+# Total size of cached replies before least recently used ones go; 0 disables
+CACHE_MB = float(os.environ.get("MAOU_LLM_CACHE_MB", "50"))
+
+CacheKey = namedtuple("CacheKey", ["digest", "provider", "model"])
+
+def normalize_content(content):
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True)
+    lines = content.replace("\r\n", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+def llm_params(llm):
+    """Parameters that change the reply, taken from the client itself"""
+    params = dict(getattr(llm, "_identifying_params", {}))
+    # The same model name on another server is another model
+    params["endpoint"] = getattr(llm, "openai_api_base", None) or getattr(llm, "base_url", None)
+    return params
+
+def cache_key(provider, model, messages, params):
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "messages": [[message.type, normalize_content(message.content)] for message in messages],
+        "params": params,
+    }, sort_keys=True, default=str)
+    return CacheKey(hashlib.sha256(payload.encode("utf-8")).hexdigest(), provider, model)
+
+class ResponseCache:
+    """Model replies in the local database, keyed by a hash of the request.
+
+    Entries expire ttl_hours after they were stored; when the stored
+    replies grow past max_bytes the least recently used are evicted.
+    Hits and misses of this process are counted for stats().
+    """
+
+    def __init__(self, engine, ttl_hours=CACHE_TTL_HOURS, max_mb=CACHE_MB):
+        self.engine = engine
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        """Cached reply for key or None; a hit refreshes its LRU position"""
+        now = datetime.utcnow()
+        with session_scope(self.engine) as session:
+            entry = session.get(LLMCacheEntry, key.digest)
+            if entry is None or entry.created_at < now - self.ttl:
+                self._count(False)
+                return None
+            session.execute(
+                update(LLMCacheEntry)
+                .where(LLMCacheEntry.key == key.digest)
+                .values(hits=LLMCacheEntry.hits + 1, last_used_at=now)
+            )
+            response = entry.response
+        self._count(True)
+        return response
+
+    def put(self, key, response):
+        if not response:
+            return
+        now = datetime.utcnow()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with session_scope(self.engine) as session:
+            session.merge(LLMCacheEntry(
+                key=key.digest, provider=key.provider, model=key.model, response=response,
+                size=size, hits=0, created_at=now, last_used_at=now,
+            ))
+            session.flush()
+            self._evict(session, now)
+
+    def _evict(self, session, now):
+        session.execute(delete(LLMCacheEntry).where(LLMCacheEntry.created_at < now - self.ttl))
+        total = session.execute(select(func.sum(LLMCacheEntry.size))).scalar() or 0
+        if total <= self.max_bytes:
+            return
+        # Keep the most recently used entries that fit, newest first
+        running = select(
+            LLMCacheEntry.key,
+            func.sum(LLMCacheEntry.size).over(
+                order_by=(LLMCacheEntry.last_used_at.desc(), LLMCacheEntry.key)
+            ).label("running"),
+        ).subquery()
+        session.execute(
+            delete(LLMCacheEntry)
+            .where(LLMCacheEntry.key.in_(select(running.c.key).where(running.c.running > self.max_bytes)))
+            .execution_options(synchronize_session=False)
+        )
+
+    def stats(self):
+        with session_scope(self.engine) as session:
+            entries, size, saved = session.execute(
+                select(func.count(), func.coalesce(func.sum(LLMCacheEntry.size), 0),
+                       func.coalesce(func.sum(LLMCacheEntry.hits), 0))
+            ).one()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+            "total_hits": saved,
+        }
+
+    def clear(self):
+        with session_scope(self.engine) as session:
+            removed = session.execute(delete(LLMCacheEntry)).rowcount
+        with self._lock:
+            self.hits = self.misses = 0
+        return removed
+
+if __name__ == '__main__':
+    import argparse
+    from models.base import get_engine, init_db
+
+    parser = argparse.ArgumentParser(description="Show or clear the AI response cache")
+    parser.add_argument("action", choices=["stats", "clear"])
+    parser.add_argument("--database", default="database.db")
+    args = parser.parse_args()
+
+    engine = get_engine(args.database)
+    init_db(engine)
+    cache = ResponseCache(engine)
+    if args.action == "clear":
+        print(f"Removed {cache.clear()} cached replies")
+    else:
+        stats = cache.stats()
+        print(f"{stats['entries']} cached replies, {stats['bytes'] / 1024:.1f} KB, "
+              f"answered {stats['total_hits']} requests without calling the model")
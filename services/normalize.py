@@ -0,0 +1,65 @@
+import re
+
+def normalize_email(value):
+    value = (value or "").strip().lower()
+    return value or None
+
+def normalize_phone(value):
+    """Digits only, keeping an international + (a leading 00 counts as +)"""
+    value = (value or "").strip()
+    digits = re.sub(r"\D", "", value)
+    if not digits:
+        return None
+    if value.startswith("+"):
+        return f"+{digits}"
+    if digits.startswith("00"):
+        return f"+{digits[2:]}"
+    return digits
+
+def normalize_header(value):
+    return re.sub(r"[^a-z0-9]", "", (value or "").lower())
+
+# Country code assumed for phone numbers written without one
+DEFAULT_COUNTRY_CODE = "1"
+
+def e164_phone(value, country_code=DEFAULT_COUNTRY_CODE):
+    """Best effort E.164 form: + followed by country code and number"""
+    phone = normalize_phone(value)
+    if phone is None or phone.startswith("+"):
+        return phone
+    if phone.startswith(country_code) and len(phone) > 10:
+        return f"+{phone}"
+    # A leading 0 is a national trunk prefix outside North America
+    return f"+{country_code}{phone.lstrip('0')}"
+
+def email_key(value):
+    """Mailbox identity: lower case, without +tags, and without dots for Gmail"""
+    email = normalize_email(value)
+    if not email or "@" not in email:
+        return None
+    local, _, domain = email.rpartition("@")
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local = local.replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}" if local else None
+
+SOUNDEX_CODES = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+
+def soundex(value):
+    """American Soundex of the first word, e.g. Robert and Rupert give R163"""
+    words = (value or "").lower().split()
+    letters = re.sub(r"[^a-z]", "", words[0]) if words else ""
+    if not letters:
+        return None
+    code = letters[0].upper()
+    previous = letters[0].translate(SOUNDEX_CODES)
+    for letter in letters[1:]:
+        digit = letter.translate(SOUNDEX_CODES)
+        if digit.isdigit() and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+        if len(code) == 4:
+            break
+    return code.ljust(4, "0")
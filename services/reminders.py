@@ -0,0 +1,146 @@
+from collections import namedtuple
+import heapq
+import threading
+from sqlalchemy import and_, event, inspect, or_, select
+from sqlalchemy.orm import Session, object_session
+from models.task import Task
+from services.stats import INACTIVE_STATUSES, is_active
+
+Reminder = namedtuple("Reminder", ["when", "task_id", "title"])
+
+def upcoming_reminders(session, user_id, after, after_id=0, limit=200):
+    """Next reminders after the (when, task_id) cursor, via ix_tasks_assignee_reminder"""
+    rows = session.execute(
+        select(Task.reminder_date, Task.id, Task.title)
+        .where(
+            Task.assigned_to_id == user_id,
+            Task.reminder_date.isnot(None),
+            or_(Task.reminder_date > after, and_(Task.reminder_date == after, Task.id > after_id)),
+            Task.status.notin_(INACTIVE_STATUSES),
+        )
+        .order_by(Task.reminder_date, Task.id)
+        .limit(limit)
+    )
+    return [Reminder(*row) for row in rows]
+
+class ReminderQueue:
+    """Min-heap over a window of the earliest reminders of one user.
+
+    Only reminders up to the window's horizon are held; when the window was
+    cut off by the page limit and runs dry, the caller loads the next page
+    after the horizon. Removed or rescheduled reminders stay in the heap as
+    stale entries and are skipped when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}
+        # (when, task_id) of the last loaded reminder, None when all are loaded
+        self.horizon = None
+
+    def __len__(self):
+        return len(self._live)
+
+    def load(self, reminders, truncated):
+        for reminder in reminders:
+            self._push(reminder)
+        self.horizon = (reminders[-1].when, reminders[-1].task_id) if truncated and reminders else None
+
+    def needs_page(self):
+        return not self._live and self.horizon is not None
+
+    def schedule(self, reminder, now):
+        self.remove(reminder.task_id)
+        # A reminder that is already due has fired or was missed; editing
+        # the task must not show it again
+        if reminder.when <= now:
+            return
+        # Beyond the horizon it is picked up with the next page
+        if self.horizon is None or (reminder.when, reminder.task_id) <= self.horizon:
+            self._push(reminder)
+
+    def remove(self, task_id):
+        self._live.pop(task_id, None)
+
+    def _push(self, reminder):
+        self._live[reminder.task_id] = reminder
+        heapq.heappush(self._heap, reminder)
+
+    def _drop_stale(self):
+        while self._heap and self._live.get(self._heap[0].task_id) != self._heap[0]:
+            heapq.heappop(self._heap)
+
+    def next_time(self):
+        self._drop_stale()
+        return self._heap[0].when if self._heap else None
+
+    def pop_due(self, now):
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0].when <= now:
+            reminder = heapq.heappop(self._heap)
+            del self._live[reminder.task_id]
+            due.append(reminder)
+            self._drop_stale()
+        return due
+
+    def clear(self):
+        self._heap = []
+        self._live = {}
+        self.horizon = None
+
+# Committed reminder changes go to these callbacks, on the committing thread
+_listeners = []
+_lock = threading.Lock()
+
+def add_listener(callback):
+    with _lock:
+        _listeners.append(callback)
+
+def remove_listener(callback):
+    with _lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+def _stage(target, *changes):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("reminder_changes", []).extend(changes)
+
+def _reminder_change(target):
+    """("set", user_id, reminder) when target should remind, else ("remove", task_id)"""
+    if target.reminder_date is None or not is_active(target.status):
+        return ("remove", target.id)
+    return ("set", target.assigned_to_id, Reminder(target.reminder_date, target.id, target.title))
+
+@event.listens_for(Task, "after_insert")
+def _task_inserted(mapper, connection, target):
+    if target.reminder_date is not None:
+        _stage(target, _reminder_change(target))
+
+@event.listens_for(Task, "after_update")
+def _task_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes()
+           for attr in ("reminder_date", "status", "title", "assigned_to_id")):
+        # A reassigned task leaves the old assignee's queue
+        _stage(target, ("remove", target.id), _reminder_change(target))
+
+@event.listens_for(Task, "after_delete")
+def _task_deleted(mapper, connection, target):
+    _stage(target, ("remove", target.id))
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged(session):
+    changes = session.info.pop("reminder_changes", None)
+    if not changes:
+        return
+    with _lock:
+        listeners = list(_listeners)
+    for callback in listeners:
+        callback(changes)
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_staged(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("reminder_changes", None)
@@ -0,0 +1,215 @@
+from datetime import datetime
+import os
+import threading
+import numpy as np
+from langchain_core.messages import SystemMessage
+from sqlalchemy import or_, select
+from models import events
+from models.base import session_scope
+from models.contact import Contact
+from models.task import Task
+from services.embeddings import default_embedder
+from services.vector_index import VectorIndex
+
+INDEX_DIR = os.environ.get("MAOU_VECTOR_INDEX", "vector_index")
+# Records added to each chat prompt
+TOP_K = int(os.environ.get("MAOU_RAG_TOP_K", "5"))
+# Longest record text put in a prompt
+RECORD_CHARS = 500
+BATCH_SIZE = 1000
+
+# Contacts and tasks share one index; the low bit of the key tells them apart
+CONTACT, TASK = 0, 1
+
+def record_key(kind, record_id):
+    return record_id * 2 + kind
+
+def split_key(key):
+    return key % 2, key // 2
+
+def _join(*parts):
+    return " ".join(part for part in parts if part)
+
+def contact_text(contact):
+    role = " at ".join(part for part in (contact.position, contact.company) if part)
+    return _join(
+        f"Contact {contact.first_name} {contact.last_name}" + (f", {role}." if role else "."),
+        contact.email and f"Email {contact.email}.",
+        contact.phone and f"Phone {contact.phone}.",
+        contact.address and f"Address {contact.address}.",
+        contact.notes and f"Notes: {contact.notes}",
+    )
+
+def task_text(task, contact_name=None):
+    details = [task.status.value if task.status else None,
+               task.priority and f"{task.priority.value} priority",
+               task.due_date and f"due {task.due_date:%Y-%m-%d}"]
+    return _join(
+        f"Task {task.title} ({', '.join(detail for detail in details if detail)})",
+        contact_name and f"for {contact_name}.",
+        task.description,
+    )
+
+# Plain columns rather than entities; a full sync reads every record once
+CONTACT_COLUMNS = ["id", "first_name", "last_name", "email", "phone", "company",
+                   "position", "address", "notes", "updated_at"]
+TASK_COLUMNS = ["id", "title", "description", "status", "priority", "due_date", "updated_at"]
+
+def _contacts(user_id):
+    return select(*(getattr(Contact, column) for column in CONTACT_COLUMNS)).where(Contact.owner_id == user_id)
+
+def _tasks(user_id):
+    return (
+        select(*(getattr(Task, column) for column in TASK_COLUMNS),
+               (Contact.first_name + " " + Contact.last_name).label("contact_name"))
+        .outerjoin(Contact, Task.contact_id == Contact.id)
+        .where(Task.assigned_to_id == user_id)
+    )
+
+class Retriever:
+    """Finds the CRM records most relevant to a chat message.
+
+    Each user's contacts and tasks are embedded into their own VectorIndex
+    under directory. Commits that touch contacts or tasks mark the indexes
+    stale through the data bus; the next sync embeds only rows updated
+    since the last one and drops rows that were deleted. Task text names
+    the task's contact, so tasks of a changed or deleted contact are
+    embedded again too.
+    """
+
+    def __init__(self, engine, embedder=None, directory=INDEX_DIR):
+        self.engine = engine
+        self.embedder = embedder or default_embedder()
+        self.directory = os.path.join(directory, self.embedder.name)
+        self.version = 0
+        self._indexes = {}
+        self._synced = {}
+        self._lock = threading.Lock()
+        self._user_locks = {}
+        events.subscribe(self.tables_changed)
+
+    def tables_changed(self, tables):
+        if tables & {"contacts", "tasks"}:
+            with self._lock:
+                self.version += 1
+
+    def index(self, user_id):
+        with self._lock:
+            if user_id not in self._indexes:
+                self._indexes[user_id] = VectorIndex(os.path.join(self.directory, f"user_{user_id}"))
+                self._user_locks[user_id] = threading.Lock()
+            return self._indexes[user_id], self._user_locks[user_id]
+
+    def sync(self, user_id):
+        """Bring the user's index up to date with the database"""
+        index, lock = self.index(user_id)
+        with lock:
+            with self._lock:
+                version = self.version
+            if self._synced.get(user_id) == version:
+                return
+            watermarks = index.meta.setdefault("watermarks", {})
+            with session_scope(self.engine) as session:
+                contacts_since = self._watermark(watermarks, Contact)
+                tasks_since = self._watermark(watermarks, Task)
+                contacts = _contacts(user_id)
+                if contacts_since is not None:
+                    contacts = contacts.where(self._changed_since(Contact, contacts_since))
+                self._embed_since(session, index, watermarks, CONTACT, Contact, contacts, contacts_since)
+                removed = self._drop_deleted(session, index, CONTACT, Contact, user_id)
+                tasks = _tasks(user_id)
+                if tasks_since is not None:
+                    # The contact's name is part of the task text
+                    tasks = tasks.where(or_(
+                        self._changed_since(Task, tasks_since),
+                        self._changed_since(Contact, contacts_since),
+                        Task.contact_id.in_(removed),
+                    ))
+                self._embed_since(session, index, watermarks, TASK, Task, tasks, tasks_since)
+                self._drop_deleted(session, index, TASK, Task, user_id)
+            if index.needs_training():
+                index.train()
+            index.flush()
+            self._synced[user_id] = version
+
+    @staticmethod
+    def _watermark(watermarks, table):
+        since = watermarks.get(table.__tablename__)
+        return datetime.fromisoformat(since) if since is not None else None
+
+    @staticmethod
+    def _changed_since(table, since):
+        if since is None:
+            return table.id.isnot(None)
+        # Rows stamped in the same instant as the watermark are embedded again
+        return or_(table.updated_at >= since, table.updated_at.is_(None))
+
+    def _embed_since(self, session, index, watermarks, kind, table, query, since):
+        """Embed the rows of query and move table's watermark to the newest one"""
+        latest = self._embed(session, index, kind, query)
+        if latest is not None and (since is None or latest > since):
+            watermarks[table.__tablename__] = latest.isoformat()
+
+    def _embed(self, session, index, kind, query):
+        latest = None
+        result = session.execute(query.execution_options(yield_per=BATCH_SIZE))
+        for rows in result.partitions():
+            if kind == CONTACT:
+                texts = [contact_text(row) for row in rows]
+            else:
+                texts = [task_text(row, row.contact_name) for row in rows]
+            index.upsert([record_key(kind, row.id) for row in rows], self.embedder.embed(texts))
+            stamps = [row.updated_at for row in rows if row.updated_at]
+            if stamps:
+                latest = max([latest, *stamps]) if latest else max(stamps)
+        return latest
+
+    def _drop_deleted(self, session, index, kind, table, user_id):
+        """Remove records whose row is gone; returns their ids"""
+        owner = Contact.owner_id if table is Contact else Task.assigned_to_id
+        stored = np.fromiter(index.rows.keys(), dtype=np.int64, count=len(index.rows))
+        stored = stored[stored % 2 == kind] // 2
+        # Compare ids, not counts: a delete and an insert in one sync keep the count
+        ids = np.fromiter(session.scalars(select(table.id).where(owner == user_id)), dtype=np.int64)
+        removed = [int(record_id) for record_id in np.setdiff1d(stored, ids)]
+        index.remove([record_key(kind, record_id) for record_id in removed])
+        return removed
+
+    def search(self, user_id, question, k=TOP_K):
+        """[(kind, id, score)] of the user's records closest to question"""
+        self.sync(user_id)
+        index, _ = self.index(user_id)
+        vector = self.embedder.embed([question])[0]
+        return [(*split_key(key), score) for key, score in index.search(vector, k)]
+
+    def context(self, user_id, question, k=TOP_K):
+        """The top k records as text for the prompt, or None when nothing matches"""
+        found = self.search(user_id, question, k)
+        if not found:
+            return None
+        contact_ids = [record_id for kind, record_id, _ in found if kind == CONTACT]
+        task_ids = [record_id for kind, record_id, _ in found if kind == TASK]
+        texts = {}
+        with session_scope(self.engine) as session:
+            if contact_ids:
+                for row in session.execute(_contacts(user_id).where(Contact.id.in_(contact_ids))):
+                    texts[(CONTACT, row.id)] = contact_text(row)
+            if task_ids:
+                for row in session.execute(_tasks(user_id).where(Task.id.in_(task_ids))):
+                    texts[(TASK, row.id)] = task_text(row, row.contact_name)
+        lines = [f"- {texts[(kind, record_id)][:RECORD_CHARS]}"
+                 for kind, record_id, _ in found if (kind, record_id) in texts]
+        if not lines:
+            return None
+        return "Records from the user's CRM that may be relevant:\n" + "\n".join(lines)
+
+def add_context(retriever, user_id, question, messages):
+    """messages with the records relevant to question inserted before it"""
+    try:
+        context = retriever.context(user_id, question)
+    except Exception:
+        # Chat still works without records, e.g. while an embedding server is down
+        return messages
+    if context is None:
+        return messages
+    return messages[:-1] + [SystemMessage(content=context)] + messages[-1:]
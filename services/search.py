@@ -0,0 +1,32 @@
+from collections import namedtuple
+import re
+from sqlalchemy import text
+
+SearchResult = namedtuple("SearchResult", ["kind", "id", "title", "snippet"])
+
+MAX_TERMS = 8
+
+SEARCH_SQL = text("""
+    SELECT rowid, title, snippet(search_index, 1, '', '', '...', 10)
+    FROM search_index
+    WHERE search_index MATCH :query AND owner_id = :owner_id
+    ORDER BY rank
+    LIMIT :limit
+""")
+
+def build_match_query(text_input):
+    """Turn free text into an FTS5 query: every term must prefix-match"""
+    terms = re.findall(r"\w+", text_input.lower())[:MAX_TERMS]
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search(session, owner_id, text_input, limit=20):
+    """Ranked contacts and tasks visible to owner_id matching text_input"""
+    query = build_match_query(text_input)
+    if not query:
+        return []
+    rows = session.execute(SEARCH_SQL, {"query": query, "owner_id": owner_id, "limit": limit})
+    results = []
+    for rowid, title, snippet in rows:
+        kind = "task" if rowid % 2 else "contact"
+        results.append(SearchResult(kind, rowid // 2, title.strip(), snippet.strip()))
+    return results
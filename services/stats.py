@@ -0,0 +1,171 @@
+from collections import namedtuple
+from datetime import datetime
+import threading
+from sqlalchemy import and_, case, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+from models.contact import Contact
+from models.task import Task, TaskStatus
+
+DashboardStats = namedtuple("DashboardStats", ["contacts", "active_tasks", "overdue_tasks"])
+
+INACTIVE_STATUSES = (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+
+def is_active(status):
+    return status is not None and status not in INACTIVE_STATUSES
+
+def compute_stats(session, user_id, now=None):
+    """All dashboard metrics in one statement.
+
+    Returns (stats, next_due) where next_due is the earliest due date of an
+    active task that is not overdue yet; the overdue count is exact until then.
+    """
+    now = now or datetime.utcnow()
+    active = Task.status.notin_(INACTIVE_STATUSES)
+    contact_count = (
+        select(func.count()).select_from(Contact)
+        .where(Contact.owner_id == user_id)
+        .scalar_subquery()
+    )
+    row = session.execute(
+        select(
+            contact_count,
+            func.coalesce(func.sum(case((active, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((and_(active, Task.due_date < now), 1), else_=0)), 0),
+            func.min(case((and_(active, Task.due_date >= now), Task.due_date))),
+        ).where(Task.assigned_to_id == user_id)
+    ).one()
+    return DashboardStats(row[0], row[1], row[2]), row[3]
+
+class StatsCache:
+    """Per-user dashboard counters kept current by ORM events.
+
+    Counter changes are staged on the session and applied on commit, so a
+    rolled back flush leaves the cache untouched. Writes that bypass the ORM
+    must call invalidate().
+
+    Stats are computed outside the lock. Every invalidate() and apply()
+    bumps a generation counter, and a result is only stored if none ran
+    while it was computed; otherwise it may miss that change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+
+    def get(self, session, user_id, now=None):
+        now = now or datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and (entry["next_due"] is None or now < entry["next_due"]):
+                return DashboardStats(entry["contacts"], entry["active"], entry["overdue"])
+            generation = self._generation
+        stats, next_due = compute_stats(session, user_id, now)
+        with self._lock:
+            if generation != self._generation:
+                # Still correct for this caller's snapshot, just not cacheable
+                return stats
+            self._entries[user_id] = {
+                "contacts": stats.contacts,
+                "active": stats.active_tasks,
+                "overdue": stats.overdue_tasks,
+                "next_due": next_due,
+            }
+        return stats
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def apply(self, changes):
+        with self._lock:
+            self._generation += 1
+            for kind, user_id, sign, status, due_date in changes:
+                entry = self._entries.get(user_id)
+                if entry is None:
+                    continue
+                if kind == "contact":
+                    entry["contacts"] += sign
+                else:
+                    self._apply_task(entry, sign, status, due_date)
+
+    @staticmethod
+    def _apply_task(entry, sign, status, due_date):
+        if not is_active(status):
+            return
+        entry["active"] += sign
+        if due_date is None:
+            return
+        next_due = entry["next_due"]
+        # Tasks due before next_due are exactly the ones counted as overdue
+        if sign < 0:
+            if next_due is None or due_date < next_due:
+                entry["overdue"] -= 1
+        elif due_date < datetime.utcnow():
+            entry["overdue"] += 1
+        elif next_due is None or due_date < next_due:
+            entry["next_due"] = due_date
+
+stats_cache = StatsCache()
+
+def _stage(target, *changes):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("stats_changes", []).extend(changes)
+
+def _old_value(target, attr):
+    history = inspect(target).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, attr)
+
+@event.listens_for(Contact, "after_insert")
+def _contact_inserted(mapper, connection, target):
+    _stage(target, ("contact", target.owner_id, 1, None, None))
+
+@event.listens_for(Contact, "after_delete")
+def _contact_deleted(mapper, connection, target):
+    _stage(target, ("contact", target.owner_id, -1, None, None))
+
+@event.listens_for(Contact, "after_update")
+def _contact_updated(mapper, connection, target):
+    old_owner = _old_value(target, "owner_id")
+    if old_owner != target.owner_id:
+        _stage(target,
+               ("contact", old_owner, -1, None, None),
+               ("contact", target.owner_id, 1, None, None))
+
+@event.listens_for(Task, "after_insert")
+def _task_inserted(mapper, connection, target):
+    _stage(target, ("task", target.assigned_to_id, 1, target.status, target.due_date))
+
+@event.listens_for(Task, "after_delete")
+def _task_deleted(mapper, connection, target):
+    _stage(target, ("task", target.assigned_to_id, -1, target.status, target.due_date))
+
+@event.listens_for(Task, "after_update")
+def _task_updated(mapper, connection, target):
+    old = (
+        _old_value(target, "assigned_to_id"),
+        _old_value(target, "status"),
+        _old_value(target, "due_date"),
+    )
+    new = (target.assigned_to_id, target.status, target.due_date)
+    if old != new:
+        _stage(target, ("task", old[0], -1, old[1], old[2]), ("task", new[0], 1, new[1], new[2]))
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged(session):
+    changes = session.info.pop("stats_changes", None)
+    if changes:
+        stats_cache.apply(changes)
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_staged(session, transaction):
+    # Anything still staged when the outermost transaction ends was rolled back
+    if transaction.parent is None:
+        session.info.pop("stats_changes", None)
@@ -0,0 +1,18 @@
+from sqlalchemy.orm import joinedload
+from models.task import Task
+
+def task_query(session, user_id):
+    """Tasks assigned to a user with their contact loaded in the same SELECT"""
+    return (
+        session.query(Task)
+        .options(joinedload(Task.contact))
+        .filter(Task.assigned_to_id == user_id)
+    )
+
+def get_task(session, task_id):
+    return (
+        session.query(Task)
+        .options(joinedload(Task.contact))
+        .filter(Task.id == task_id)
+        .one_or_none()
+    )
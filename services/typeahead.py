@@ -0,0 +1,214 @@
+from collections import defaultdict, namedtuple
+import bisect
+import heapq
+import re
+import threading
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+from models.contact import Contact
+
+Suggestion = namedtuple("Suggestion", ["id", "label", "score"])
+
+def normalize(value):
+    return " ".join(re.findall(r"\w+", (value or "").lower()))
+
+def trigrams(text, partial_last_word=False):
+    """Space-padded trigrams of every word.
+
+    While typing, the last word is incomplete, so its closing pad is dropped.
+    """
+    grams = set()
+    words = text.split()
+    for position, word in enumerate(words):
+        closing = "" if partial_last_word and position == len(words) - 1 else " "
+        padded = f" {word}{closing}"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def contact_label(first_name, last_name, email=None):
+    name = f"{first_name or ''} {last_name or ''}".strip()
+    return f"{name} <{email}>" if email else name
+
+class ContactIndex:
+    """Prefix and trigram index over contact name, email and company for one owner.
+
+    Prefix matches come from a sorted key list via bisect; when they do not
+    fill the result, trigram posting lists supply fuzzy matches. Neither
+    path scans every contact.
+    """
+    PREFIX_SCAN_LIMIT = 500
+    # Grams present in more than this share of contacts say little about a match
+    COMMON_GRAM_SHARE = 0.05
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._keys = []
+        self._postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, contact_id, first_name, last_name, email=None, company=None):
+        with self._lock:
+            self._remove(contact_id)
+            for key in self._index_entry(contact_id, first_name, last_name, email, company):
+                bisect.insort(self._keys, key)
+
+    def add_many(self, rows):
+        """Bulk load (id, first_name, last_name, email, company) rows"""
+        with self._lock:
+            for row in rows:
+                self._remove(row[0])
+                self._keys.extend(self._index_entry(*row))
+            self._keys.sort()
+
+    def _index_entry(self, contact_id, first_name, last_name, email, company):
+        name = normalize(f"{first_name or ''} {last_name or ''}")
+        text = normalize(f"{name} {email or ''} {company or ''}")
+        keys = {(word, contact_id) for word in text.split()}
+        keys.add((name, contact_id))
+        grams = trigrams(text)
+        self._entries[contact_id] = (contact_label(first_name, last_name, email), keys, grams)
+        for gram in grams:
+            self._postings[gram].add(contact_id)
+        return keys
+
+    def remove(self, contact_id):
+        with self._lock:
+            self._remove(contact_id)
+
+    def _remove(self, contact_id):
+        entry = self._entries.pop(contact_id, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            position = bisect.bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+        for gram in entry[2]:
+            postings = self._postings[gram]
+            postings.discard(contact_id)
+            if not postings:
+                del self._postings[gram]
+
+    def label(self, contact_id):
+        entry = self._entries.get(contact_id)
+        return entry[0] if entry else None
+
+    def search(self, text, limit=10):
+        text = normalize(text)
+        if not text:
+            return []
+        with self._lock:
+            found = self._prefix_matches(text, limit)
+            if len(found) < limit and len(text) >= 3:
+                fuzzy = self._score_trigrams(trigrams(text, partial_last_word=True))
+                for contact_id, score in heapq.nlargest(limit, fuzzy.items(), key=lambda item: item[1]):
+                    if len(found) == limit:
+                        break
+                    found.setdefault(contact_id, score)
+            return [Suggestion(contact_id, self._entries[contact_id][0], score)
+                    for contact_id, score in found.items()]
+
+    def _prefix_matches(self, text, limit):
+        found = {}
+        start = bisect.bisect_left(self._keys, (text,))
+        for position in range(start, min(start + self.PREFIX_SCAN_LIMIT, len(self._keys))):
+            key, contact_id = self._keys[position]
+            if not key.startswith(text) or len(found) == limit:
+                break
+            found.setdefault(contact_id, 1.0)
+        return found
+
+    def _score_trigrams(self, grams):
+        # Score is the share of query trigrams a contact contains; very
+        # common grams are not counted and treated as matched by everyone
+        common = max(50, int(len(self._entries) * self.COMMON_GRAM_SHARE))
+        counts = defaultdict(int)
+        skipped = 0
+        for gram in grams:
+            ids = self._postings.get(gram, ())
+            if len(ids) > common:
+                skipped += 1
+                continue
+            for contact_id in ids:
+                counts[contact_id] += 1
+        total = len(grams)
+        return {contact_id: (count + skipped) / total for contact_id, count in counts.items()
+                if (count + skipped) * 2 >= total}
+
+class ContactIndexRegistry:
+    """Per-owner indexes, built on first use and then kept current by ORM events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def get(self, owner_id):
+        with self._lock:
+            return self._indexes.get(owner_id)
+
+    def build(self, session, owner_id):
+        existing = self.get(owner_id)
+        if existing is not None:
+            return existing
+        index = ContactIndex()
+        index.add_many(session.execute(
+            select(Contact.id, Contact.first_name, Contact.last_name, Contact.email, Contact.company)
+            .where(Contact.owner_id == owner_id)
+            .execution_options(yield_per=2000)
+        ))
+        with self._lock:
+            return self._indexes.setdefault(owner_id, index)
+
+    def invalidate(self, owner_id=None):
+        with self._lock:
+            if owner_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(owner_id, None)
+
+    def apply(self, changes):
+        for action, owner_id, values in changes:
+            index = self.get(owner_id)
+            if index is None:
+                continue
+            if action == "remove":
+                index.remove(values[0])
+            else:
+                index.add(*values)
+
+contact_indexes = ContactIndexRegistry()
+
+def _stage(target, *changes):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("typeahead_changes", []).extend(changes)
+
+def _values(target):
+    return (target.id, target.first_name, target.last_name, target.email, target.company)
+
+@event.listens_for(Contact, "after_insert")
+@event.listens_for(Contact, "after_update")
+def _contact_saved(mapper, connection, target):
+    history = inspect(target).attrs.owner_id.history
+    for old_owner in history.deleted:
+        if old_owner != target.owner_id:
+            _stage(target, ("remove", old_owner, (target.id,)))
+    _stage(target, ("add", target.owner_id, _values(target)))
+
+@event.listens_for(Contact, "after_delete")
+def _contact_deleted(mapper, connection, target):
+    _stage(target, ("remove", target.owner_id, (target.id,)))
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged(session):
+    changes = session.info.pop("typeahead_changes", None)
+    if changes:
+        contact_indexes.apply(changes)
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_staged(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("typeahead_changes", None)
@@ -0,0 +1,264 @@
+import json
+import math
+import os
+import threading
+import numpy as np
+
+# Below this many rows every query scans all of them
+TRAIN_MIN_ROWS = 20000
+# Rows a query scans once the index is partitioned; sets the probe count
+SCAN_ROWS = 48000
+KMEANS_ITERATIONS = 8
+SAMPLE_PER_LIST = 32
+GROWTH = 2
+COPY_CHUNK = 65536
+
+class VectorIndex:
+    """Memory-mapped vectors with an inverted-file layout for fast top-k.
+
+    Vectors live in a float32 file mapped with np.memmap, next to the key
+    and list number of every row, so opening an index is cheap and updates
+    write only the rows they touch.
+
+    Once the index reaches TRAIN_MIN_ROWS, spherical k-means splits it into
+    about sqrt(n) lists and the files are rewritten with each list's rows
+    stored together. A query scores the centroids, then scores only the
+    closest lists, roughly SCAN_ROWS rows, straight from their contiguous
+    blocks. Rows added or moved to another list since training are kept
+    in a small overflow list per cluster until the next training, which
+    happens whenever the index has doubled. Removed rows become tombstones
+    whose slots are reused.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.RLock()
+        self.meta = {"dim": None, "count": 0, "capacity": 0, "trained_count": 0}
+        self.vectors = self.keys = self.lists = None
+        self.centroids = None
+        # Start row of each list's block, plus the end of the last block
+        self.blocks = None
+        self.rows = {}
+        self.free = []
+        self._overflow = self._overflow_starts = None
+        path = self._path("meta.json")
+        if os.path.exists(path):
+            with open(path) as source:
+                self.meta.update(json.load(source))
+            self._open()
+            if os.path.exists(self._path("centroids.npy")):
+                self.centroids = np.load(self._path("centroids.npy"))
+                self.blocks = np.load(self._path("blocks.npy"))
+            keys = np.asarray(self.keys[:self.count])
+            live = np.flatnonzero(keys >= 0)
+            self.rows = dict(zip(keys[live].tolist(), live.tolist()))
+            self.free = np.flatnonzero(keys < 0).tolist()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @property
+    def count(self):
+        return self.meta["count"]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _open_arrays(self, suffix=""):
+        capacity, dim = self.meta["capacity"], self.meta["dim"]
+        return (
+            np.memmap(self._path("vectors.f32" + suffix), np.float32, "r+", shape=(capacity, dim)),
+            np.memmap(self._path("keys.i64" + suffix), np.int64, "r+", shape=(capacity,)),
+            np.memmap(self._path("lists.i32" + suffix), np.int32, "r+", shape=(capacity,)),
+        )
+
+    def _open(self):
+        self.vectors, self.keys, self.lists = self._open_arrays()
+
+    def _create_files(self, capacity, suffix=""):
+        os.makedirs(self.directory, exist_ok=True)
+        for name, item_size in (("vectors.f32", 4 * self.meta["dim"]), ("keys.i64", 8), ("lists.i32", 4)):
+            with open(self._path(name + suffix), "ab") as target:
+                target.truncate(capacity * item_size)
+
+    def _grow(self, needed):
+        capacity = max(needed, self.meta["capacity"] * GROWTH, 1024)
+        if self.vectors is not None:
+            self.flush()
+            self.vectors = self.keys = self.lists = None
+        self._create_files(capacity)
+        old_capacity, self.meta["capacity"] = self.meta["capacity"], capacity
+        self._open()
+        # New slots start as tombstones
+        self.keys[old_capacity:] = -1
+        self.lists[old_capacity:] = -1
+
+    def _assign(self, vectors):
+        if self.centroids is None:
+            return np.zeros(len(vectors), dtype=np.int32)
+        assigned = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), 8192):
+            chunk = vectors[start:start + 8192]
+            assigned[start:start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assigned
+
+    def upsert(self, keys, vectors):
+        """Insert or overwrite the vectors of keys; call flush() to persist"""
+        if not len(keys):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self.lock:
+            if self.meta["dim"] is None:
+                self.meta["dim"] = vectors.shape[1]
+            elif vectors.shape[1] != self.meta["dim"]:
+                raise ValueError(f"Expected {self.meta['dim']} dimensions, got {vectors.shape[1]}")
+            rows = []
+            for key in keys:
+                row = self.rows.get(key)
+                if row is None:
+                    row = self.free.pop() if self.free else self._next_row()
+                    self.rows[key] = row
+                rows.append(row)
+            if self.count > self.meta["capacity"]:
+                self._grow(self.count)
+            rows = np.asarray(rows)
+            self.vectors[rows] = vectors
+            self.keys[rows] = keys
+            self.lists[rows] = self._assign(vectors)
+            self._overflow = None
+
+    def _next_row(self):
+        self.meta["count"] += 1
+        return self.meta["count"] - 1
+
+    def remove(self, keys):
+        with self.lock:
+            rows = [self.rows.pop(key) for key in keys if key in self.rows]
+            if rows:
+                self.keys[rows] = -1
+                self.lists[rows] = -1
+                self.free.extend(rows)
+                self._overflow = None
+
+    def flush(self):
+        with self.lock:
+            if self.vectors is None:
+                return
+            for array in (self.vectors, self.keys, self.lists):
+                array.flush()
+            if self.centroids is not None:
+                np.save(self._path("centroids.npy"), self.centroids)
+                np.save(self._path("blocks.npy"), self.blocks)
+            partial = self._path("meta.json.part")
+            with open(partial, "w") as target:
+                json.dump(self.meta, target)
+            os.replace(partial, self._path("meta.json"))
+
+    def needs_training(self):
+        rows = len(self.rows)
+        return rows >= TRAIN_MIN_ROWS and rows >= 2 * self.meta["trained_count"]
+
+    def train(self, seed=0):
+        """Cluster the rows into about sqrt(n) lists and store each list contiguously"""
+        with self.lock:
+            live = np.flatnonzero(np.asarray(self.keys[:self.count]) >= 0)
+            nlist = max(1, int(math.sqrt(len(live))))
+            random = np.random.default_rng(seed)
+            sample = np.sort(random.choice(live, min(len(live), nlist * SAMPLE_PER_LIST), replace=False))
+            data = np.asarray(self.vectors[sample])
+            centroids = data[random.choice(len(data), nlist, replace=False)]
+            for _ in range(KMEANS_ITERATIONS):
+                assigned = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assigned, data)
+                empty = np.bincount(assigned, minlength=nlist) == 0
+                # Empty lists restart from a random sample point
+                sums[empty] = data[random.choice(len(data), int(empty.sum()))]
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+            self.centroids = centroids
+            lists = np.empty(len(live), dtype=np.int32)
+            for start in range(0, len(live), COPY_CHUNK):
+                lists[start:start + COPY_CHUNK] = self._assign(np.asarray(self.vectors[live[start:start + COPY_CHUNK]]))
+            self._cluster(live, lists)
+
+    def _cluster(self, live, lists):
+        """Rewrite the files with live rows grouped by list, dropping tombstones"""
+        by_list = np.argsort(lists, kind="stable")
+        source_rows, lists = live[by_list], lists[by_list]
+        self._create_files(self.meta["capacity"], ".new")
+        vectors, keys, new_lists = self._open_arrays(".new")
+        for start in range(0, len(source_rows), COPY_CHUNK):
+            rows = source_rows[start:start + COPY_CHUNK]
+            end = start + len(rows)
+            vectors[start:end] = self.vectors[rows]
+            keys[start:end] = self.keys[rows]
+            new_lists[start:end] = lists[start:end]
+        keys[len(source_rows):] = -1
+        new_lists[len(source_rows):] = -1
+        for array in (vectors, keys, new_lists):
+            array.flush()
+        del vectors, keys, new_lists
+        self.vectors = self.keys = self.lists = None
+        for name in ("vectors.f32", "keys.i64", "lists.i32"):
+            os.replace(self._path(name + ".new"), self._path(name))
+        self._open()
+        self.meta["count"] = self.meta["trained_count"] = len(source_rows)
+        self.blocks = np.searchsorted(lists, np.arange(len(self.centroids) + 1))
+        self.rows = dict(zip(np.asarray(self.keys[:self.count]).tolist(), range(self.count)))
+        self.free = []
+        self._overflow = None
+        self.flush()
+
+    def _build_overflow(self):
+        """Rows whose list differs from the block they are stored in, by list"""
+        lists = np.asarray(self.lists[:self.count])
+        if self.centroids is None:
+            stored = np.zeros(self.count, dtype=np.int32)
+        else:
+            end = self.blocks[-1]
+            stored = np.full(self.count, -1, dtype=np.int32)
+            stored[:end] = np.repeat(np.arange(len(self.centroids), dtype=np.int32), np.diff(self.blocks))
+        moved = np.flatnonzero((lists != stored) & (lists >= 0))
+        self._overflow = moved[np.argsort(lists[moved], kind="stable")]
+        self._overflow_starts = np.searchsorted(lists[self._overflow], np.arange(len(self.blocks) if self.blocks is not None else 2))
+
+    def _score_list(self, number, query, start, end, rows, scores):
+        """Score one list: the rows still in its block, then its overflow"""
+        if end > start:
+            # Rows moved to another list or removed stay behind in the block
+            valid = np.asarray(self.lists[start:end]) == number
+            rows.append(np.flatnonzero(valid) + start)
+            scores.append((self.vectors[start:end] @ query)[valid])
+        moved = self._overflow[self._overflow_starts[number]:self._overflow_starts[number + 1]]
+        if len(moved):
+            rows.append(moved)
+            scores.append(self.vectors[moved] @ query)
+
+    def search(self, vector, k=5):
+        """[(key, score)] of the k rows closest to vector by cosine similarity"""
+        with self.lock:
+            if not self.rows:
+                return []
+            if self._overflow is None:
+                self._build_overflow()
+            query = np.asarray(vector, dtype=np.float32)
+            rows, scores = [], []
+            nlist = 1 if self.centroids is None else len(self.centroids)
+            probes = min(nlist, max(1, math.ceil(SCAN_ROWS * nlist / len(self.rows))))
+            if probes * 2 > nlist:
+                # Most of the index anyway; one pass over every row is faster
+                live = np.asarray(self.lists[:self.count]) >= 0
+                rows.append(np.flatnonzero(live))
+                scores.append((self.vectors[:self.count] @ query)[live])
+            else:
+                for number in np.argpartition(self.centroids @ query, -probes)[-probes:]:
+                    self._score_list(number, query, self.blocks[number], self.blocks[number + 1], rows, scores)
+            rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+            if not len(rows):
+                return []
+            scores = np.concatenate(scores)
+            k = min(k, len(rows))
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self.keys[rows[i]]), float(scores[i])) for i in top]
@@ -0,0 +1,152 @@
+"""Measure time to first token, inter-token latency and throughput of an AI provider.
+
+Clients come from the same registry the chat uses. Without --endpoint the
+bundled stub server is started with the --stub-* settings, so runs are
+reproducible offline.
+
+Usage: python -m tools.bench_llm [--provider Custom] [--requests 40] [--concurrency 1 4 8] [--output bench.json]
+       python -m tools.bench_llm --provider Ollama --endpoint http://localhost:11434 --model llama3
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import json
+import platform
+import sys
+import time
+import numpy as np
+from langchain_core.callbacks.base import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+from services.ai_providers import PROVIDERS, clear_clients, get_client
+from tools.llm_stub_server import StubServer
+
+PROMPTS = [
+    "Write a short follow-up email to a client after a product demo.",
+    "Summarize in two sentences: the customer wants a discount on a renewal due next month.",
+    "List three questions to ask a new lead about their budget.",
+    "Suggest a subject line for a meeting reminder.",
+]
+PERCENTILES = [50, 90, 99]
+
+class TokenTimer(BaseCallbackHandler):
+    """Timestamps every streamed token of one request"""
+
+    def __init__(self):
+        self.times = []
+
+    def on_llm_new_token(self, token, **kwargs):
+        if token:
+            self.times.append(time.perf_counter())
+
+def load_prompts(path):
+    """A JSON list of prompts or a text file with one prompt per line"""
+    with open(path, encoding="utf-8") as source:
+        text = source.read()
+    if path.endswith(".json"):
+        return [str(prompt) for prompt in json.loads(text)]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+def run_request(settings, prompt):
+    timer = TokenTimer()
+    start = time.perf_counter()
+    try:
+        get_client(settings).invoke([HumanMessage(content=prompt)], config={"callbacks": [timer]})
+    except Exception as error:
+        return {"error": f"{type(error).__name__}: {error}"}
+    end = time.perf_counter()
+    times = timer.times
+    return {
+        "ttft": times[0] - start if times else None,
+        "gaps": np.diff(times).tolist(),
+        "tokens": len(times),
+        "duration": end - start,
+    }
+
+def percentiles(values):
+    if not len(values):
+        return None
+    return {f"p{p}": round(float(value) * 1000, 3) for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+def benchmark(settings, prompts, requests, concurrency, warmup=1):
+    for prompt in prompts[:warmup]:
+        # Opens connections and loads the model, which is not what is measured
+        run_request(settings, prompt)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda index: run_request(settings, prompts[index % len(prompts)]),
+                                    range(requests)))
+    wall = time.perf_counter() - start
+    done = [result for result in results if "error" not in result]
+    tokens = sum(result["tokens"] for result in done)
+    return {
+        "requests": requests,
+        "errors": len(results) - len(done),
+        "error_samples": sorted({result["error"] for result in results if "error" in result})[:5],
+        "wall_seconds": round(wall, 3),
+        "tokens": tokens,
+        "tokens_per_second": round(tokens / wall, 2) if wall else None,
+        "requests_per_second": round(len(done) / wall, 2) if wall else None,
+        "ttft_ms": percentiles([result["ttft"] for result in done if result["ttft"] is not None]),
+        "inter_token_ms": percentiles([gap for result in done for gap in result["gaps"]]),
+        "request_ms": percentiles([result["duration"] for result in done]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--provider", choices=PROVIDERS, default="Custom")
+    parser.add_argument("--model", default="stub")
+    parser.add_argument("--endpoint", help="API key, Ollama URL or Custom base URL; the stub server when omitted")
+    parser.add_argument("--prompts", help="JSON list or text file with one prompt per line")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4],
+                        help="one run per concurrency level")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--stub-tokens", type=int, default=50)
+    parser.add_argument("--stub-delay", type=float, default=0.01, help="seconds between stub tokens")
+    parser.add_argument("--stub-first-delay", type=float, default=0.1, help="seconds before the first stub token")
+    args = parser.parse_args()
+
+    prompts = load_prompts(args.prompts) if args.prompts else PROMPTS
+    server = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        if args.provider == "OpenAI":
+            parser.error("OpenAI needs --endpoint with an API key")
+        server = StubServer(tokens=args.stub_tokens, delay=args.stub_delay, first_delay=args.stub_first_delay)
+        server.start()
+        endpoint = f"{server.url}/v1" if args.provider == "Custom" else server.url
+    settings = {"provider": args.provider, "model": args.model, "api_key": endpoint}
+
+    report = {
+        "provider": args.provider,
+        "model": args.model,
+        "endpoint": endpoint if args.provider != "OpenAI" else None,
+        "stub": {"tokens": args.stub_tokens, "delay": args.stub_delay, "first_delay": args.stub_first_delay}
+        if server else None,
+        "prompts": len(prompts),
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": [],
+    }
+    try:
+        for concurrency in args.concurrency:
+            clear_clients()
+            result = benchmark(settings, prompts, args.requests, concurrency, args.warmup)
+            result["concurrency"] = concurrency
+            report["runs"].append(result)
+            ttft, gaps = result["ttft_ms"] or {}, result["inter_token_ms"] or {}
+            print(f"concurrency {concurrency:3}: ttft p50 {ttft.get('p50')} ms p99 {ttft.get('p99')} ms, "
+                  f"inter-token p50 {gaps.get('p50')} ms p99 {gaps.get('p99')} ms, "
+                  f"{result['tokens_per_second']} tokens/s, {result['errors']} errors")
+    finally:
+        if server:
+            server.shutdown()
+    if args.output:
+        with open(args.output, "w") as target:
+            json.dump(report, target, indent=2)
+        print(f"Wrote {args.output}")
+    return 1 if any(run["errors"] for run in report["runs"]) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
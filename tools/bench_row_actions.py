@@ -0,0 +1,83 @@
+"""Compare per-row action widgets against the shared RowActionsDelegate.
+
+Usage: python -m tools.bench_row_actions [--rows 10000]
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import (QApplication, QTableWidget, QTableView, QWidget,
+                             QHBoxLayout, QPushButton)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from ui.views.base_view import RowActionsDelegate
+
+COLUMNS = 7
+
+class StaticModel(QAbstractTableModel):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else COLUMNS
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.column() < COLUMNS - 1:
+            return f"r{index.row()}c{index.column()}"
+        return None
+
+def build_cell_widgets(rows):
+    """The old approach: a widget, layout and two buttons per row"""
+    table = QTableWidget(rows, COLUMNS)
+    for row in range(rows):
+        layout = QHBoxLayout()
+        layout.setSpacing(2)
+        layout.setContentsMargins(2, 2, 2, 2)
+        edit_btn = QPushButton("Edit")
+        edit_btn.setStyleSheet("min-height: 20px; max-height: 25px; min-width: 30px; max-width: 40px;")
+        delete_btn = QPushButton("Del")
+        delete_btn.setStyleSheet("min-height: 20px; max-height: 25px; min-width: 30px; max-width: 40px;")
+        layout.addWidget(edit_btn)
+        layout.addWidget(delete_btn)
+        widget = QWidget()
+        widget.setLayout(layout)
+        table.setCellWidget(row, COLUMNS - 1, widget)
+    return table
+
+def build_delegate(rows):
+    table = QTableView()
+    table.setModel(StaticModel(rows))
+    table.setItemDelegateForColumn(COLUMNS - 1, RowActionsDelegate(table))
+    return table
+
+def measure(app, build, rows):
+    start = time.perf_counter()
+    table = build(rows)
+    table.resize(1000, 700)
+    table.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    widgets = len(table.findChildren(QWidget))
+    table.close()
+    table.deleteLater()
+    app.processEvents()
+    return elapsed, widgets
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for name, build in (("cell widgets", build_cell_widgets), ("delegate", build_delegate)):
+        elapsed, widgets = measure(app, build, args.rows)
+        print(f"{name:>12}: {elapsed * 1000:9.1f} ms, {widgets:6d} child widgets for {args.rows} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Measure the time from starting Python to the login window being painted.
+
+Each run is a fresh interpreter that imports main, builds MaouCRM and
+reports once the event loop has shown the window. Runs use a scratch
+working directory, so the database and session files of the checkout
+are left alone. Exits non-zero when the median is over --budget seconds
+or more than --tolerance above the time saved with --save-baseline.
+
+Usage: python -m tools.bench_startup [--runs 5] [--save-baseline]
+       python -m tools.bench_startup --baseline startup_baseline.json --tolerance 0.2
+       python -m tools.bench_startup --budget 1.5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "startup_baseline.json")
+
+CHILD = r"""
+import sys, time
+start = time.perf_counter()
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+import main
+imported = time.perf_counter()
+window = main.MaouCRM()
+window.show()
+
+def painted():
+    print(f"startup {imported - start:.6f} {time.perf_counter() - start:.6f}", flush=True)
+    app.quit()
+
+QTimer.singleShot(0, painted)
+app.exec_()
+"""
+
+def run_once(directory, env):
+    """(seconds to the painted window, seconds spent importing main) of one fresh process"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=directory, env=env,
+                            capture_output=True, text=True, timeout=120)
+    elapsed = time.perf_counter() - start
+    line = next((line for line in result.stdout.splitlines() if line.startswith("startup ")), None)
+    if result.returncode or line is None:
+        raise SystemExit(f"startup run failed:\n{result.stderr[-2000:]}")
+    imported, _ = map(float, line.split()[1:])
+    # From launch, not from the first line of Python; includes interpreter startup
+    return elapsed, imported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this median as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown over the baseline")
+    parser.add_argument("--budget", type=float, help="fail when the median takes longer, in seconds")
+    parser.add_argument("--json", help="also write the measurements to this file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY") and sys.platform.startswith("linux"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    directory = tempfile.mkdtemp(prefix="maou_startup_")
+    try:
+        # The first run creates the scratch database and warms the file cache
+        run_once(directory, env)
+        runs = [run_once(directory, env) for _ in range(max(1, args.runs))]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    totals = [total for total, _ in runs]
+    median = statistics.median(totals)
+    result = {
+        "runs": len(runs),
+        "median_seconds": round(median, 4),
+        "min_seconds": round(min(totals), 4),
+        "max_seconds": round(max(totals), 4),
+        "import_main_seconds": round(statistics.median(imported for _, imported in runs), 4),
+    }
+    print(f"login window after {result['median_seconds']:.3f}s median "
+          f"(min {result['min_seconds']:.3f}s, max {result['max_seconds']:.3f}s, "
+          f"import main {result['import_main_seconds']:.3f}s) over {len(runs)} runs")
+
+    failed = False
+    if args.save_baseline:
+        with open(args.baseline, "w") as target:
+            json.dump(result, target, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as source:
+            baseline = json.load(source)["median_seconds"]
+        limit = baseline * (1 + args.tolerance)
+        result["baseline_seconds"] = baseline
+        print(f"baseline {baseline:.3f}s, limit {limit:.3f}s")
+        if median > limit:
+            print(f"Startup regressed by {(median / baseline - 1) * 100:.0f}%")
+            failed = True
+    if args.budget is not None and median > args.budget:
+        print(f"Startup is over the {args.budget:.3f}s budget")
+        failed = True
+    if args.json:
+        with open(args.json, "w") as target:
+            json.dump(result, target, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
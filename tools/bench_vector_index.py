@@ -0,0 +1,71 @@
+"""Measure VectorIndex query latency and recall on synthetic CRM records.
+
+Usage: python -m tools.bench_vector_index [--rows 500000] [--queries 200]
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+import numpy as np
+from services.embeddings import HashingEmbedder
+from services.vector_index import VectorIndex
+
+WORDS = ["follow", "up", "call", "meeting", "proposal", "invoice", "contract", "renewal", "demo", "budget"]
+
+def synthetic_records(count, seed=1):
+    rng = random.Random(seed)
+    first = [f"first{i}" for i in range(3000)]
+    last = [f"last{i}" for i in range(8000)]
+    companies = [f"company{i}" for i in range(20000)]
+    for i in range(count):
+        name = f"{rng.choice(first)} {rng.choice(last)}"
+        if i % 2:
+            yield f"Contact {name}, manager at {rng.choice(companies)}. Email user{i}@example.com."
+        else:
+            yield f"Task {' '.join(rng.sample(WORDS, 3))} (To-do) for {name} of {rng.choice(companies)}."
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    embedder = HashingEmbedder()
+    texts = list(synthetic_records(args.rows))
+    start = time.perf_counter()
+    vectors = np.concatenate([embedder.embed(texts[i:i + 10000]) for i in range(0, len(texts), 10000)])
+    print(f"embedded {len(texts)} records in {time.perf_counter() - start:.1f}s")
+
+    directory = tempfile.mkdtemp(prefix="vector_index_")
+    try:
+        index = VectorIndex(directory)
+        start = time.perf_counter()
+        for i in range(0, len(vectors), 10000):
+            index.upsert(list(range(i, min(i + 10000, len(vectors)))), vectors[i:i + 10000])
+        if index.needs_training():
+            index.train()
+        index.flush()
+        print(f"built index in {time.perf_counter() - start:.1f}s")
+
+        index = VectorIndex(directory)
+        rng = random.Random(2)
+        # Partial records, like a question mentioning a name and company
+        queries = embedder.embed([" ".join(rng.choice(texts).split()[1:5]) for _ in range(args.queries)])
+        index.search(queries[0], args.k)
+        latencies, recall = [], 0.0
+        for query in queries:
+            start = time.perf_counter()
+            found = index.search(query, args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            exact = set(np.argpartition(vectors @ query, -args.k)[-args.k:].tolist())
+            recall += len(exact & {key for key, _ in found}) / args.k
+        p50, p95 = np.percentile(latencies, [50, 95])
+        print(f"query p50 {p50:.2f} ms, p95 {p95:.2f} ms, max {max(latencies):.2f} ms, "
+              f"recall@{args.k} {recall / len(queries):.3f}")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Check that task edits only schedule reminders that are still to come.
+
+Builds a scratch database and runs a ReminderScheduler for one user. It
+then renames a task whose reminder is past, adds a task reminding at the
+current time (the task dialog's default), and adds one reminding shortly
+after. Only the last may fire; the run fails with the reminders that did.
+
+Usage: python -m tools.check_reminders
+"""
+from datetime import datetime, timedelta
+import os
+import shutil
+import sys
+import tempfile
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+from models.base import get_engine, init_db, session_scope
+from models.task import Task
+from models.user import User
+from ui.reminders import ReminderScheduler
+from ui.workers import QueryRunner
+
+def wait(msecs):
+    loop = QEventLoop()
+    QTimer.singleShot(msecs, loop.quit)
+    loop.exec_()
+
+def check(engine):
+    """Titles of the reminders that fired"""
+    with session_scope(engine) as session:
+        user = User(username="check", email="check@example.com", password_hash="x")
+        session.add(user)
+        session.flush()
+        past = Task(title="Past", assigned_to_id=user.id, reminder_date=datetime.now() - timedelta(hours=1))
+        session.add(past)
+    fired = []
+    queries = QueryRunner(engine)
+    scheduler = ReminderScheduler(queries)
+    scheduler.reminder_due.connect(lambda task_id, title: fired.append(title))
+    scheduler.start(user.id)
+    wait(200)
+
+    with session_scope(engine) as session:
+        session.merge(past).title = "Past, renamed"
+    with session_scope(engine) as session:
+        session.add(Task(title="Now", assigned_to_id=user.id, reminder_date=datetime.now()))
+        session.add(Task(title="Soon", assigned_to_id=user.id,
+                         reminder_date=datetime.now() + timedelta(milliseconds=300)))
+    wait(800)
+    scheduler.stop()
+    queries.shutdown()
+    return fired
+
+def main():
+    app = QCoreApplication(sys.argv)
+    directory = tempfile.mkdtemp(prefix="maou_reminders_")
+    try:
+        engine = get_engine(os.path.join(directory, "check.db"))
+        init_db(engine)
+        fired = check(engine)
+        engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    if fired != ["Soon"]:
+        print(f"Expected only the future reminder to fire, got {fired}")
+        return 1
+    print("Only the future reminder fired")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
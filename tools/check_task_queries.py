@@ -0,0 +1,73 @@
+"""Check that a page of the task list costs one SELECT however many tasks it shows.
+
+Builds a scratch database with --tasks tasks, each linked to a contact,
+loads the first TaskTableModel page and renders every cell under
+count_queries(limit=1). A lazy load of Task.contact per row (an N+1
+regression) makes the run fail with the statements it issued.
+
+Usage: python -m tools.check_task_queries [--tasks 200]
+"""
+import argparse
+from datetime import datetime, timedelta
+import os
+import shutil
+import sys
+import tempfile
+from models.base import count_queries, get_engine, init_db, session_scope
+from models.contact import Contact
+from models.task import Task
+from models.user import User
+from ui.views.table_models import TaskTableModel
+
+def seed(engine, count):
+    with session_scope(engine) as session:
+        user = User(username="check", email="check@example.com", password_hash="x")
+        session.add(user)
+        session.flush()
+        contacts = [Contact(first_name=f"First{i}", last_name=f"Last{i}", owner_id=user.id) for i in range(count)]
+        session.add_all(contacts)
+        session.flush()
+        start = datetime(2024, 1, 1)
+        session.add_all(
+            Task(title=f"Task {i}", due_date=start + timedelta(hours=i), assigned_to_id=user.id,
+                 contact_id=contacts[i].id)
+            for i in range(count)
+        )
+        return user.id
+
+def check(engine, user_id):
+    """Statements issued to load and render one page"""
+    model = TaskTableModel(queries=None)
+    model.user_id = user_id
+    with count_queries(engine, limit=1) as counter:
+        # Render while the session is open so lazy loads run and get counted
+        with session_scope(engine) as session:
+            model._append_page(model.page_query(session).limit(model.page_size).all())
+            for row in range(model.rowCount()):
+                for column in range(model.columnCount()):
+                    model.data(model.index(row, column))
+    return model.rowCount(), counter.count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="maou_queries_")
+    try:
+        engine = get_engine(os.path.join(directory, "check.db"))
+        init_db(engine)
+        user_id = seed(engine, args.tasks)
+        try:
+            rows, statements = check(engine, user_id)
+        except AssertionError as error:
+            print(error)
+            return 1
+        print(f"Rendered {rows} tasks with their contacts in {statements} query")
+        engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
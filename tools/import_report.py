@@ -0,0 +1,121 @@
+"""Report which imports make up the startup time, from python -X importtime.
+
+Runs a fresh interpreter that imports --module (main by default) and
+ranks modules by cumulative and self time. --forbid fails the run when
+any of the given packages was imported, to keep slow optional modules
+out of startup.
+
+Usage: python -m tools.import_report [--module main] [--top 20] [--runs 3] [--json report.json]
+       python -m tools.import_report --forbid langchain_core langchain_community numpy pandas
+       python -X importtime -c "import main" 2> importtime.log; python -m tools.import_report --log importtime.log
+"""
+import argparse
+from collections import defaultdict
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+def parse(text):
+    """[(name, self_us, cumulative_us, depth)] in the order Python printed them"""
+    rows = []
+    for line in text.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append((name, int(own), int(cumulative), len(indent) // 2))
+    return rows
+
+def measure(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return result.stderr
+
+def combine(runs):
+    """Median self and cumulative time of every module over several runs"""
+    times = defaultdict(lambda: ([], []))
+    depths = {}
+    for rows in runs:
+        for name, own, cumulative, depth in rows:
+            times[name][0].append(own)
+            times[name][1].append(cumulative)
+            depths.setdefault(name, depth)
+    return [(name, int(statistics.median(own)), int(statistics.median(cumulative)), depths[name])
+            for name, (own, cumulative) in times.items()]
+
+def report(rows, module, top):
+    total = next((cumulative for name, _, cumulative, _ in rows if name == module), None)
+    if total is None:
+        total = sum(own for _, own, _, _ in rows)
+    packages = defaultdict(int)
+    for name, own, _, _ in rows:
+        packages[name.split(".")[0]] += own
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 1),
+        "modules": len(rows),
+        "by_cumulative": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1), "depth": depth}
+            for name, _, cumulative, depth in sorted(rows, key=lambda row: -row[2])[:top]
+        ],
+        "by_self": [
+            {"module": name, "self_ms": round(own / 1000, 1)}
+            for name, own, _, _ in sorted(rows, key=lambda row: -row[1])[:top]
+        ],
+        "by_package": [
+            {"package": package, "self_ms": round(own / 1000, 1)}
+            for package, own in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+    }
+
+def print_report(summary):
+    print(f"import {summary['module']}: {summary['total_ms']} ms over {summary['modules']} modules\n")
+    print("Slowest by cumulative time (includes what they import):")
+    for row in summary["by_cumulative"]:
+        print(f"  {row['cumulative_ms']:9.1f} ms  {'  ' * min(row['depth'], 8)}{row['module']}")
+    print("\nSlowest by own time:")
+    for row in summary["by_self"]:
+        print(f"  {row['self_ms']:9.1f} ms  {row['module']}")
+    print("\nOwn time by top-level package:")
+    for row in summary["by_package"]:
+        print(f"  {row['self_ms']:9.1f} ms  {row['package']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--log", help="parse this saved -X importtime output instead of running")
+    parser.add_argument("--runs", type=int, default=1, help="median over this many fresh interpreters")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--forbid", nargs="*", default=[], help="fail if any of these packages was imported")
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, encoding="utf-8") as source:
+            runs = [parse(source.read())]
+    else:
+        runs = [parse(measure(args.module)) for _ in range(max(1, args.runs))]
+    rows = combine(runs)
+    summary = report(rows, args.module, args.top)
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+    summary["forbidden"] = sorted(imported & set(args.forbid))
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as target:
+            json.dump(summary, target, indent=2)
+    if summary["forbidden"]:
+        print(f"\nImported at startup but should not be: {', '.join(summary['forbidden'])}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
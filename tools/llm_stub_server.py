@@ -0,0 +1,219 @@
+"""Local stand-in for OpenAI-compatible and Ollama endpoints.
+
+Streams a canned reply and records, for every request, which TCP
+connection carried it, so connection reuse by the chat clients can be
+checked without a real model.
+
+With --fail-rate a share of requests is answered with 429 or 500 at
+random, to exercise retries in the batch enrichment.
+
+--first-delay holds back the first token, like a model reading the prompt.
+
+Usage: python -m tools.llm_stub_server [--port 8765] [--tokens 20] [--delay 0.01] [--first-delay 0.2]
+       [--fail-rate 0.2]
+       python -m tools.llm_stub_server --check [--requests 5]
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connection open between requests
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection_id = next(self.server.connection_ids)
+        self.served = 0
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.served += 1
+        self.server.record(self.connection_id, self.served, self.path)
+        path = self.path.rstrip("/")
+        if self.server.should_fail():
+            self.send_json(random.choice((429, 500)), {"error": {"message": "stub failure", "type": "stub"}})
+        elif path.endswith("/chat/completions"):
+            self.openai_reply(body)
+        elif path == "/api/generate":
+            self.ollama_reply(body)
+        else:
+            self.send_json(404, {"error": f"no stub for {self.path}"})
+
+    def tokens(self):
+        for index in range(self.server.tokens):
+            delay = self.server.first_delay if index == 0 else self.server.delay
+            if delay:
+                time.sleep(delay)
+            yield f"token{index} "
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def start_chunked(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, data, last=False):
+        data = data.encode("utf-8")
+        # Clients close the response at the final event; sending the
+        # terminating chunk with it lets them return the connection to the pool
+        end = b"0\r\n\r\n" if last else b""
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n" + end)
+        self.wfile.flush()
+
+    def openai_reply(self, body):
+        model = body.get("model", "stub")
+        if not body.get("stream"):
+            content = "".join(self.tokens())
+            self.send_json(200, {
+                "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": self.server.tokens,
+                          "total_tokens": self.server.tokens + 1},
+            })
+            return
+        self.start_chunked("text/event-stream")
+        chunk = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for token in self.tokens():
+            delta = {"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}
+            self.write_chunk(f"data: {json.dumps({**chunk, 'choices': [delta]})}\n\n")
+        done = {"index": 0, "delta": {}, "finish_reason": "stop"}
+        self.write_chunk(f"data: {json.dumps({**chunk, 'choices': [done]})}\n\n")
+        self.write_chunk("data: [DONE]\n\n", last=True)
+
+    def ollama_reply(self, body):
+        self.start_chunked("application/x-ndjson")
+        model = body.get("model", "stub")
+        for token in self.tokens():
+            self.write_chunk(json.dumps({"model": model, "response": token, "done": False}) + "\n")
+        self.write_chunk(json.dumps({"model": model, "response": "", "done": True}) + "\n", last=True)
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, tokens=20, delay=0.0, verbose=False, fail_rate=0.0,
+                 first_delay=0.0):
+        super().__init__((host, port), StubHandler)
+        self.tokens = tokens
+        self.delay = delay
+        self.first_delay = first_delay
+        self.fail_rate = fail_rate
+        self.failures = 0
+        self.verbose = verbose
+        self.connection_ids = itertools.count(1)
+        # (connection, request number on that connection, path) per request
+        self.requests = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, connection_id, served, path):
+        with self._lock:
+            self.requests.append((connection_id, served, path))
+
+    def should_fail(self):
+        if self.fail_rate and random.random() < self.fail_rate:
+            with self._lock:
+                self.failures += 1
+            return True
+        return False
+
+    def connection_stats(self):
+        with self._lock:
+            requests = list(self.requests)
+        return {
+            "requests": len(requests),
+            "connections": len({connection for connection, _, _ in requests}),
+            "reused": sum(1 for _, served, _ in requests if served > 1),
+            "failures": self.failures,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = []
+            self.failures = 0
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+def check(server, count):
+    """Send count messages per provider through the client registry"""
+    from langchain_core.messages import HumanMessage
+    from services.ai_providers import get_client
+
+    failed = False
+    for provider, endpoint in (("Custom", f"{server.url}/v1"), ("Ollama", server.url)):
+        server.reset_stats()
+        settings = {"provider": provider, "model": "stub", "api_key": endpoint}
+        clients = set()
+        for _ in range(count):
+            client = get_client(settings)
+            clients.add(id(client))
+            client.invoke([HumanMessage(content="ping")])
+        stats = server.connection_stats()
+        print(f"{provider:8} clients={len(clients)} requests={stats['requests']} "
+              f"connections={stats['connections']} reused={stats['reused']}")
+        if len(clients) != 1:
+            failed = True
+        if provider == "Custom" and stats["connections"] != 1:
+            failed = True
+    return 1 if failed else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds between tokens")
+    parser.add_argument("--first-delay", type=float, default=0.0, help="seconds before the first token")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--check", action="store_true", help="check client and connection reuse, then exit")
+    parser.add_argument("--requests", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.check:
+        server = StubServer(args.host, 0, args.tokens, args.delay)
+        server.start()
+        try:
+            return check(server, args.requests)
+        finally:
+            server.shutdown()
+
+    server = StubServer(args.host, args.port, args.tokens, args.delay, verbose=True, fail_rate=args.fail_rate,
+                        first_delay=args.first_delay)
+    print(f"Serving on {server.url} (OpenAI-compatible base URL {server.url}/v1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = server.connection_stats()
+        print(f"{stats['requests']} requests over {stats['connections']} connections, "
+              f"{stats['failures']} failed on purpose")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import re
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QTextCursor
+from langchain_core.callbacks.base import BaseCallbackHandler
+
+class GenerationCancelled(Exception):
+    pass
+
+class TokenBuffer(BaseCallbackHandler):
+    """Collects streamed tokens on the worker thread until the GUI drains them"""
+    # Let GenerationCancelled escape langchain's handler and abort the stream
+    raise_error = True
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.received = False
+        self._lock = threading.Lock()
+        self._parts = []
+
+    def on_llm_new_token(self, token, **kwargs):
+        if self.cancelled.is_set():
+            raise GenerationCancelled()
+        with self._lock:
+            self._parts.append(token)
+            self.received = True
+
+    def drain(self):
+        with self._lock:
+            text = "".join(self._parts)
+            self._parts = []
+        return text
+
+# Words with their trailing whitespace, the size of typical model tokens
+REPLAY_TOKEN = re.compile(r"\S+\s*|\s+")
+
+class GenerationJob(QRunnable):
+    def __init__(self, streamer, llm, messages, cache=None, cache_key=None, prepare=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.streamer = streamer
+        self.llm = llm
+        self.messages = messages
+        self.cache = cache
+        self.cache_key = cache_key
+        self.prepare = prepare
+        self.buffer = TokenBuffer()
+
+    def generate(self):
+        messages = self.messages
+        if self.prepare is not None:
+            messages = self.prepare(messages)
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(messages)
+            text = self.cache.get(key)
+            if text is not None:
+                # Replay through the same buffer so a cached reply renders like a live one
+                for token in REPLAY_TOKEN.findall(text):
+                    self.buffer.on_llm_new_token(token)
+                return text
+        result = self.llm.invoke(messages, config={"callbacks": [self.buffer]})
+        # Chat models return a message, plain LLMs a string
+        text = getattr(result, "content", result)
+        if self.cache is not None:
+            self.cache.put(key, text)
+        return text
+
+    def run(self):
+        try:
+            if self.buffer.cancelled.is_set():
+                raise GenerationCancelled()
+            text = self.generate()
+        except GenerationCancelled:
+            self.streamer.job_cancelled.emit(self)
+        except Exception as error:
+            self.streamer.job_failed.emit(self, error)
+        else:
+            self.streamer.job_finished.emit(self, text)
+
+class ChatStream(QObject):
+    """Runs one generation at a time on a worker thread.
+
+    Tokens are buffered off the GUI thread and handed out as one text_ready
+    chunk per frame, so the text widget is touched at most ~60 times a
+    second however fast the model streams.
+    """
+    text_ready = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+    FRAME_MS = 16
+
+    job_finished = pyqtSignal(object, object)
+    job_failed = pyqtSignal(object, object)
+    job_cancelled = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        # Housekeeping such as summarizing history, kept off the reply path
+        self.background = QThreadPool(self)
+        self.background.setMaxThreadCount(1)
+        self.job = None
+        # Finished or cancelled jobs still running on the pool; kept referenced
+        self._retired = set()
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setInterval(self.FRAME_MS)
+        self.frame_timer.timeout.connect(self.flush)
+        self.job_finished.connect(self._finish)
+        self.job_failed.connect(self._fail)
+        self.job_cancelled.connect(self._cancelled)
+
+    @property
+    def running(self):
+        return self.job is not None
+
+    def start(self, llm, messages, cache=None, cache_key=None, prepare=None):
+        """Generate a reply to messages on the worker.
+
+        prepare(messages), when given, runs on the worker first and returns
+        the messages actually sent, e.g. with retrieved context added. With
+        a cache, cache_key(messages) gives the key; a stored reply is
+        replayed instead of calling the model.
+        """
+        self.cancel()
+        self.job = GenerationJob(self, llm, messages, cache, cache_key, prepare)
+        self.pool.start(self.job)
+        self.frame_timer.start()
+
+    def cancel(self):
+        """Stop the current generation at its next token"""
+        if self.job is None:
+            return
+        job, self.job = self.job, None
+        job.buffer.cancelled.set()
+        self.frame_timer.stop()
+        if self.pool.tryTake(job):
+            self.cancelled.emit()
+        else:
+            self._retired.add(job)
+            # The stream may already be over, report the cancel right away
+            self.cancelled.emit()
+
+    def flush(self):
+        if self.job is None:
+            return
+        text = self.job.buffer.drain()
+        if text:
+            self.text_ready.emit(text)
+
+    def _end(self, job):
+        self._retired.discard(job)
+        if job is not self.job:
+            return False
+        self.flush()
+        self.frame_timer.stop()
+        self.job = None
+        return True
+
+    @pyqtSlot(object, object)
+    def _finish(self, job, text):
+        streamed = job.buffer.received
+        if not self._end(job):
+            return
+        if not streamed and text:
+            # Models that do not stream hand back the whole reply at once
+            self.text_ready.emit(text)
+        self.finished.emit(text or "")
+
+    @pyqtSlot(object, object)
+    def _fail(self, job, error):
+        if self._end(job):
+            self.failed.emit(error)
+
+    @pyqtSlot(object)
+    def _cancelled(self, job):
+        self._retired.discard(job)
+
+    def run_background(self, fn):
+        """Run fn on a worker without holding up replies; it reports nothing back"""
+        def run():
+            try:
+                fn()
+            except Exception:
+                # Best effort; an exception escaping a pool thread aborts Qt
+                pass
+        self.background.start(run)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs) and self.background.waitForDone(msecs)
+
+def append_text(text_edit, text):
+    """Append text at the end of a read-only QTextEdit and keep it scrolled"""
+    cursor = text_edit.textCursor()
+    cursor.movePosition(QTextCursor.End)
+    cursor.insertText(text)
+    text_edit.setTextCursor(cursor)
+    text_edit.ensureCursorVisible()
@@ -0,0 +1,278 @@
+from PyQt5.QtGui import QTextBlockFormat, QTextCursor
+from PyQt5.QtWidgets import QTextEdit
+from models.chat_message import ChatMessage
+from services.chat_history import PAGE_SIZE, page
+
+# Messages kept in the document; scrolling past them loads another page
+MAX_RENDERED = 200
+MESSAGE_SPACING = 10
+PREFIXES = {ChatMessage.USER: "You: ", ChatMessage.ASSISTANT: "AI: "}
+# Keeps each message in one block, so messages map to block numbers
+LINE_SEPARATOR = "\u2028"
+
+class ChatTranscript(QTextEdit):
+    """Read-only view over a window of one stored conversation.
+
+    Each message is one text block. Only the latest page is shown at
+    first; reaching the top loads the page before it and reaching the
+    bottom of a window that was scrolled back loads the next one, on the
+    QueryRunner. The document never holds more than MAX_RENDERED
+    messages, so memory and relayout stay bounded however long the
+    conversation runs. Without a runner messages are shown but not paged.
+
+    A streamed reply stays the bottom block until it is stored: loading
+    older pages meanwhile does not trim the bottom, so the window may run
+    over MAX_RENDERED until then.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        # The undo stack would otherwise keep every removed page alive
+        self.setUndoRedoEnabled(False)
+        self.queries = None
+        self.user_id = None
+        self.conversation_id = None
+        # Stored id of each rendered message; a handle from add_message
+        # while it is being saved, None for notices and unsaved text
+        self.ids = []
+        self.has_older = False
+        self.has_newer = False
+        # Set while the document changes under the scroll bar
+        self._loading = False
+        # A page query is in flight
+        self._fetching = False
+        # The bottom message is still being streamed
+        self.streaming = False
+        # Handle of the streamed reply until its id is set
+        self._live = None
+        # Stay at the bottom as text arrives, unless the user scrolled up
+        self.follow = True
+        self.verticalScrollBar().valueChanged.connect(self.scrolled)
+        self.verticalScrollBar().rangeChanged.connect(self.range_changed)
+
+    def show_conversation(self, queries, user_id, conversation_id, rows=()):
+        """Show a conversation from its latest page of rows, as loaded by the caller"""
+        self.clear_messages()
+        self.queries, self.user_id, self.conversation_id = queries, user_id, conversation_id
+        self.has_older = len(rows) == PAGE_SIZE
+        self._insert(rows, at_end=True)
+        self.scroll_to_end()
+
+    def clear_messages(self):
+        if self.queries is not None:
+            self.queries.cancel(self)
+        self.ids = []
+        self.has_older = self.has_newer = False
+        self._fetching = False
+        self.streaming = False
+        self._live = None
+        self.clear()
+
+    def scroll_to_end(self):
+        self.follow = True
+        bar = self.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def range_changed(self, minimum, maximum):
+        if self.follow:
+            self.verticalScrollBar().setValue(maximum)
+
+    def _stored_ids(self):
+        return [message_id for message_id in self.ids if isinstance(message_id, int)]
+
+    def _insert(self, rows, at_end):
+        cursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        texts = [(message_id, PREFIXES.get(role, "") + content) for message_id, role, content in rows]
+        if not at_end:
+            texts.reverse()
+        for message_id, text in texts:
+            self._insert_block(cursor, text, at_end)
+            if at_end:
+                self.ids.append(message_id)
+            else:
+                self.ids.insert(0, message_id)
+        cursor.endEditBlock()
+
+    def _insert_block(self, cursor, text, at_end):
+        text = text.replace("\r\n", "\n").replace("\n", LINE_SEPARATOR)
+        block_format = QTextBlockFormat()
+        block_format.setBottomMargin(MESSAGE_SPACING)
+        empty = not self.ids
+        if at_end:
+            cursor.movePosition(QTextCursor.End)
+            if not empty:
+                cursor.insertBlock()
+        else:
+            cursor.movePosition(QTextCursor.Start)
+            if not empty:
+                cursor.insertBlock()
+                cursor.movePosition(QTextCursor.Start)
+        cursor.setBlockFormat(block_format)
+        cursor.insertText(text)
+
+    def _remove(self, count, from_end):
+        """Drop count messages from the top or the bottom of the document"""
+        count = min(count, len(self.ids))
+        if not count:
+            return
+        document = self.document()
+        cursor = QTextCursor(document)
+        if from_end:
+            keep = len(self.ids) - count
+            if keep:
+                block = document.findBlockByNumber(keep - 1)
+                cursor.setPosition(block.position() + block.length() - 1)
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            del self.ids[keep:]
+        else:
+            if count < len(self.ids):
+                cursor.setPosition(document.findBlockByNumber(count).position(), QTextCursor.KeepAnchor)
+            else:
+                cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            del self.ids[:count]
+        cursor.removeSelectedText()
+
+    def add_message(self, role, text, streaming=False, saved=True):
+        """Append a message at the bottom and return its handle for set_id.
+
+        With streaming the message is extended by append_to_last until
+        finish_streaming; adding another message ends it. A notice is
+        added with saved=False and gets no handle.
+        """
+        if self.has_newer:
+            # The messages between the window and the latest ones are
+            # stored; they load again on scrolling up
+            stored = self._stored_ids()
+            self.clear_messages()
+            self.has_older = bool(stored)
+        handle = object() if saved else None
+        cursor = QTextCursor(self.document())
+        self._insert_block(cursor, PREFIXES.get(role, "") + text, at_end=True)
+        self.ids.append(handle)
+        self.streaming = streaming
+        self._live = handle if streaming else None
+        self._trim_top()
+        self.scroll_to_end()
+        return handle
+
+    def add_notice(self, text):
+        """A line that is shown but not stored, such as an error"""
+        self.add_message(None, text, saved=False)
+
+    def append_to_last(self, text):
+        """Extend the streamed message, which is always the bottom block"""
+        if not self.streaming:
+            return
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text.replace("\r\n", "\n").replace("\n", LINE_SEPARATOR))
+
+    def finish_streaming(self):
+        """End the streamed message; returns its handle for set_id"""
+        self.streaming = False
+        return self._live
+
+    def set_id(self, handle, message_id):
+        """Record the stored id of the message added with handle once it is saved"""
+        if handle is None or handle not in self.ids:
+            return
+        self.ids[self.ids.index(handle)] = message_id
+        if handle is self._live and not self.streaming:
+            self._live = None
+            # Apply the trim load_older held back while the reply was live
+            excess = len(self.ids) - MAX_RENDERED
+            if excess > 0 and not self.follow:
+                self._remove(excess, from_end=True)
+                self.has_newer = True
+            else:
+                self._trim_top()
+        self._fill()
+
+    def _trim_top(self):
+        excess = len(self.ids) - MAX_RENDERED
+        if excess > 0:
+            bar = self.verticalScrollBar()
+            height, loading, self._loading = bar.maximum(), self._loading, True
+            self._remove(excess, from_end=False)
+            bar.setValue(bar.value() - (height - bar.maximum()))
+            self._loading = loading
+            self.has_older = True
+
+    def _fill(self):
+        # Without a scroll bar there is no top to reach, so load on our own
+        bar = self.verticalScrollBar()
+        if self.has_older and bar.maximum() == bar.minimum():
+            self.load_older()
+
+    def scrolled(self, value):
+        bar = self.verticalScrollBar()
+        if self._loading:
+            return
+        self.follow = value >= bar.maximum() and not self.has_newer
+        if value <= bar.minimum() and self.has_older:
+            self.load_older()
+        elif value >= bar.maximum() and self.has_newer:
+            self.load_newer()
+
+    def _fetch(self, on_rows, older):
+        stored = self._stored_ids()
+        if self.queries is None or self.conversation_id is None or not stored or self._fetching:
+            return
+        self._fetching = True
+        user_id, conversation_id = self.user_id, self.conversation_id
+        cursor = {"before": stored[0]} if older else {"after": stored[-1]}
+        self.queries.submit(
+            self,
+            lambda session: page(session, user_id, conversation_id, **cursor),
+            on_rows,
+            on_error=self._fetch_failed,
+            on_cancel=self._fetch_cancelled,
+        )
+
+    def _fetch_cancelled(self):
+        self._fetching = False
+
+    def _fetch_failed(self, error):
+        self._fetching = False
+        self.has_older = self.has_newer = False
+        self.add_notice(f"Error: could not load messages: {error}")
+
+    def load_older(self):
+        self._fetch(self._older_loaded, older=True)
+
+    def _older_loaded(self, rows):
+        self._fetching = False
+        self.has_older = len(rows) == PAGE_SIZE
+        if not rows:
+            return
+        self._loading = True
+        try:
+            bar = self.verticalScrollBar()
+            height, value = bar.maximum(), bar.value()
+            self._insert(rows, at_end=False)
+            # Keep the message that was at the top where it was
+            bar.setValue(value + bar.maximum() - height)
+            excess = len(self.ids) - MAX_RENDERED
+            if excess > 0 and self._live is None:
+                self._remove(excess, from_end=True)
+                self.has_newer = True
+        finally:
+            self._loading = False
+        self._fill()
+
+    def load_newer(self):
+        self._fetch(self._newer_loaded, older=False)
+
+    def _newer_loaded(self, rows):
+        self._fetching = False
+        if len(rows) < PAGE_SIZE:
+            self.has_newer = False
+        if rows:
+            self._loading = True
+            try:
+                self._insert(rows, at_end=True)
+                self._trim_top()
+            finally:
+                self._loading = False
@@ -1,10 +1,9 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QMessageBox, QFrame,
-                             QGraphicsDropShadowEffect)
+                             QGraphicsDropShadowEffect, QCheckBox)
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QIcon, QColor
-from models.base import get_session
-from models.user import User
+from services.auth import authenticate, issue_session_token, restore_session
 import ui.resources_rc
 
 class LoginWindow(QWidget):
@@ -12,7 +11,9 @@ class LoginWindow(QWidget):
         super().__init__(parent)
         self.parent = parent
         self.engine = parent.engine
+        self.queries = parent.queries
         self.init_ui()
+        self.restore_session()
 
     def init_ui(self):
         # Set window background
@@ -101,15 +102,18 @@ class LoginWindow(QWidget):
 
         container_layout.addWidget(password_container)
 
+        self.remember_check = QCheckBox("Keep me signed in")
+        container_layout.addWidget(self.remember_check)
+
         # Add some spacing
         container_layout.addSpacing(20)
 
         # Login button
-        login_btn = QPushButton("Sign In")
-        login_btn.setObjectName("login-button")
-        login_btn.setMinimumHeight(48)
-        login_btn.clicked.connect(self.handle_login)
-        container_layout.addWidget(login_btn)
+        self.login_btn = QPushButton("Sign In")
+        self.login_btn.setObjectName("login-button")
+        self.login_btn.setMinimumHeight(48)
+        self.login_btn.clicked.connect(self.handle_login)
+        container_layout.addWidget(self.login_btn)
 
         # Center the container
         main_layout.addStretch()
@@ -118,6 +122,14 @@ class LoginWindow(QWidget):
 
         self.setLayout(main_layout)
 
+    def restore_session(self):
+        # A valid saved token signs in without the bcrypt check
+        self.queries.submit(self, restore_session, self.session_restored, on_error=lambda error: None)
+
+    def session_restored(self, user):
+        if user:
+            self.parent.show_main(user)
+
     def handle_login(self):
         username = self.username_input.text()
         password = self.password_input.text()
@@ -126,12 +138,25 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, "Error", "Please fill in all fields")
             return
 
-        session = get_session(self.engine)
-        user = session.query(User).filter_by(username=username).first()
-
-        if user and user.check_password(password):
+        # bcrypt is deliberately slow, so it runs on the query pool too
+        self.login_btn.setEnabled(False)
+        self.queries.submit(
+            self,
+            lambda session: authenticate(session, username, password),
+            self.finish_login,
+            on_error=self.login_failed
+        )
+
+    def finish_login(self, user):
+        self.login_btn.setEnabled(True)
+        if user:
+            self.password_input.clear()
+            if self.remember_check.isChecked():
+                issue_session_token(user)
             self.parent.show_main(user)
         else:
             QMessageBox.warning(self, "Error", "Invalid username or password")
 
-        session.close()
+    def login_failed(self, error):
+        self.login_btn.setEnabled(True)
+        QMessageBox.warning(self, "Error", f"Could not sign in: {error}")
@@ -1,18 +1,64 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QStackedWidget, QLineEdit, QFrame,
-                             QSpacerItem, QSizePolicy)
-from PyQt5.QtCore import Qt, QSize
+                             QSpacerItem, QSizePolicy, QListWidget,
+                             QListWidgetItem, QSystemTrayIcon, QMessageBox)
+from PyQt5.QtCore import Qt, QSize, QTimer, QPoint, pyqtSignal
 from PyQt5.QtGui import QIcon, QFont
 from .views.contacts import ContactsView
 from .views.tasks import TasksView
 from .views.dashboard import DashboardView
-from .views.chat import ChatView
+from services.auth import clear_session_token
+from services.search import search
+from .reminders import ReminderScheduler
+from models import events
 import ui.resources_rc
 
+class SearchPopup(QListWidget):
+    """Result list shown under the search box without taking its focus"""
+    result_selected = pyqtSignal(str, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("search-popup")
+        self.setWindowFlags(Qt.Tool | Qt.FramelessWindowHint | Qt.WindowDoesNotAcceptFocus)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.itemClicked.connect(self.select_item)
+
+    def show_results(self, anchor, results):
+        self.clear()
+        if not results:
+            self.addItem("No results")
+        for result in results:
+            label = "Task" if result.kind == "task" else "Contact"
+            item = QListWidgetItem(f"{label}: {result.title}\n{result.snippet}")
+            item.setData(Qt.UserRole, (result.kind, result.id))
+            self.addItem(item)
+        self.setFixedWidth(max(anchor.width(), 320))
+        self.setFixedHeight(min(self.sizeHintForRow(0) * self.count() + 4, 400))
+        self.move(anchor.mapToGlobal(QPoint(0, anchor.height())))
+        self.show()
+
+    def select_item(self, item):
+        data = item.data(Qt.UserRole)
+        self.hide()
+        if data:
+            self.result_selected.emit(*data)
+
 class TopBar(QFrame):
+    # Emitted once typing pauses for SEARCH_DELAY_MS
+    search_requested = pyqtSignal(str)
+    SEARCH_DELAY_MS = 250
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("top-bar")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(
+            lambda: self.search_requested.emit(self.search_input.text().strip()))
+        self.search_popup = SearchPopup(self)
         self.init_ui()
 
     def init_ui(self):
@@ -29,10 +75,12 @@ class TopBar(QFrame):
         search_icon.setPixmap(QIcon(":/icons/search.svg").pixmap(QSize(16, 16)))
         search_layout.addWidget(search_icon)
 
-        search_input = QLineEdit()
-        search_input.setPlaceholderText("Search...")
-        search_input.setObjectName("search-input")
-        search_layout.addWidget(search_input)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search...")
+        self.search_input.setObjectName("search-input")
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.search_timer.timeout.emit)
+        search_layout.addWidget(self.search_input)
 
         layout.addWidget(search_container)
 
@@ -54,12 +102,40 @@ class TopBar(QFrame):
 
         self.setLayout(layout)
 
+    def show_results(self, results):
+        self.search_popup.show_results(self.search_input, results)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.search_popup.hide()
+        super().keyPressEvent(event)
+
+def chat_view(parent):
+    # The chat pulls in langchain and numpy; import them when it is first opened
+    from .views.chat import ChatView
+    return ChatView(parent)
+chat_view.depends_on = set()
+
 class MainWindow(QWidget):
+    # Re-emits data bus notifications, with their origin, on the GUI thread
+    data_changed = pyqtSignal(object, object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.user = None
         self.engine = parent.engine
+        self.queries = parent.queries
+        # Views are built on first show and refreshed only when shown stale
+        self.view_classes = [DashboardView, ContactsView, TasksView, chat_view]
+        self.views = [None] * len(self.view_classes)
+        self.dirty_views = set(range(len(self.view_classes)))
+        self.current_view = None
+        self.data_changed.connect(self.mark_dirty)
+        events.subscribe(lambda tables: self.data_changed.emit(tables, events.current_origin()))
+        self.reminders = ReminderScheduler(self.queries, self)
+        self.reminders.reminder_due.connect(self.show_reminder)
+        self.tray_icon = None
         self.init_ui()
 
     def init_ui(self):
@@ -69,6 +145,8 @@ class MainWindow(QWidget):
 
         # Top bar
         self.top_bar = TopBar(self)
+        self.top_bar.search_requested.connect(self.run_search)
+        self.top_bar.search_popup.result_selected.connect(self.open_search_result)
         layout.addWidget(self.top_bar)
 
         # Main content area
@@ -120,18 +198,8 @@ class MainWindow(QWidget):
         nav.setLayout(nav_layout)
         content.addWidget(nav)
 
-        # Stacked widget for different views
+        # Stacked widget for different views, filled in as views are first shown
         self.stack = QStackedWidget()
-        self.dashboard = DashboardView(self)
-        self.contacts = ContactsView(self)
-        self.tasks = TasksView(self)
-        self.chat = ChatView(self)
-
-        self.stack.addWidget(self.dashboard)
-        self.stack.addWidget(self.contacts)
-        self.stack.addWidget(self.tasks)
-        self.stack.addWidget(self.chat)
-
         content.addWidget(self.stack)
         layout.addLayout(content)
 
@@ -140,8 +208,27 @@ class MainWindow(QWidget):
         # Set initial view
         self.show_view(0)
 
+    def view(self, index):
+        """Return the view at index, building it on first use"""
+        if self.views[index] is None:
+            self.views[index] = self.view_classes[index](self)
+            self.stack.addWidget(self.views[index])
+        return self.views[index]
+
     def show_view(self, index):
-        self.stack.setCurrentIndex(index)
+        # Drop pending queries of the view the user is leaving; if one was
+        # cancelled the view is stale
+        previous = self.current_view
+        if previous is not None and previous != index:
+            if self.queries.cancel(self.views[previous]):
+                self.dirty_views.add(previous)
+
+        view = self.view(index)
+        self.current_view = index
+        self.stack.setCurrentWidget(view)
+        if index in self.dirty_views and self.user:
+            self.dirty_views.discard(index)
+            view.update_view()
         
         # Update button states
         for i, btn in enumerate(self.nav_buttons):
@@ -151,11 +238,57 @@ class MainWindow(QWidget):
 
     def set_user(self, user):
         self.user = user
-        self.dashboard.update_view()
-        self.contacts.update_view()
-        self.tasks.update_view()
-        self.chat.update_view()
+        self.dirty_views = set(range(len(self.view_classes)))
+        self.show_view(self.current_view or 0)
+        self.reminders.start(user.id)
+
+    def mark_dirty(self, tables, origin=None):
+        # Hidden views refresh when shown and the visible one refreshes now,
+        # unless the change is its own and it already updated its rows
+        for index, view_class in enumerate(self.view_classes):
+            if not view_class.depends_on & tables:
+                continue
+            if index != self.current_view:
+                self.dirty_views.add(index)
+            elif origin is not self.views[index]:
+                self.dirty_views.discard(index)
+                self.view(index).update_view()
+
+    def run_search(self, text):
+        # A newer search supersedes any query still in flight
+        if not text or not self.user:
+            self.queries.cancel(self.top_bar)
+            self.top_bar.search_popup.hide()
+            return
+        user_id = self.user.id
+        self.queries.submit(
+            self.top_bar,
+            lambda session: search(session, user_id, text),
+            self.top_bar.show_results
+        )
+
+    def open_search_result(self, kind, record_id):
+        index = 2 if kind == "task" else 1
+        self.show_view(index)
+        if self.user:
+            self.views[index].select_record(record_id)
+
+    def show_reminder(self, task_id, title):
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            if self.tray_icon is None:
+                self.tray_icon = QSystemTrayIcon(QIcon(":/icons/logo.svg"), self)
+                self.tray_icon.messageClicked.connect(lambda: self.show_view(2))
+                self.tray_icon.show()
+            self.tray_icon.showMessage("Task Reminder", title)
+            return
+        box = QMessageBox(QMessageBox.Information, "Task Reminder", title, QMessageBox.Ok, self)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.setModal(False)
+        box.show()
 
     def handle_logout(self):
         self.user = None
+        self.reminders.stop()
+        clear_session_token()
+        self.top_bar.search_input.clear()
         self.parent.show_login()
@@ -0,0 +1,87 @@
+from datetime import datetime
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from services.reminders import ReminderQueue, add_listener, upcoming_reminders
+
+class ReminderScheduler(QObject):
+    """Fires reminder_due for the logged in user's task reminders.
+
+    Holds the next PAGE_SIZE reminders in a ReminderQueue and arms one
+    single-shot QTimer for the earliest, so nothing runs between
+    reminders. Task edits reach the queue through the commit listener in
+    services.reminders instead of rescanning the table.
+    """
+    reminder_due = pyqtSignal(int, str)
+    # Re-emits committed changes on the GUI thread
+    changes_committed = pyqtSignal(object)
+    PAGE_SIZE = 200
+    # QTimer intervals are 32-bit milliseconds; longer waits just re-arm
+    MAX_WAIT_MS = 24 * 60 * 60 * 1000
+
+    def __init__(self, queries, parent=None):
+        super().__init__(parent)
+        self.queries = queries
+        self.user_id = None
+        self.queue = ReminderQueue()
+        # Changes committed while a page loads; the page may predate them
+        self.deferred_changes = []
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.fire_due)
+        self.changes_committed.connect(self.apply_changes)
+        add_listener(self.changes_committed.emit)
+
+    def start(self, user_id):
+        self.stop()
+        self.user_id = user_id
+        self.load_page(datetime.now())
+
+    def stop(self):
+        self.queries.cancel(self)
+        self.timer.stop()
+        self.queue.clear()
+        self.deferred_changes = []
+        self.user_id = None
+
+    def load_page(self, after, after_id=0):
+        user_id = self.user_id
+        self.queries.submit(
+            self,
+            lambda session: upcoming_reminders(session, user_id, after, after_id, self.PAGE_SIZE),
+            self.page_loaded,
+        )
+
+    def page_loaded(self, reminders):
+        self.queue.load(reminders, truncated=len(reminders) == self.PAGE_SIZE)
+        changes, self.deferred_changes = self.deferred_changes, []
+        self.apply_changes(changes)
+
+    def arm(self):
+        self.timer.stop()
+        if self.queue.needs_page():
+            if not self.queries.has_pending(self):
+                self.load_page(*self.queue.horizon)
+            return
+        when = self.queue.next_time()
+        if when is None:
+            return
+        wait = (when - datetime.now()).total_seconds() * 1000
+        self.timer.start(int(min(max(wait, 0), self.MAX_WAIT_MS)))
+
+    def fire_due(self):
+        for reminder in self.queue.pop_due(datetime.now()):
+            self.reminder_due.emit(reminder.task_id, reminder.title)
+        self.arm()
+
+    def apply_changes(self, changes):
+        if self.user_id is None:
+            return
+        if self.queries.has_pending(self):
+            self.deferred_changes.extend(changes)
+            return
+        now = datetime.now()
+        for change in changes:
+            if change[0] == "remove":
+                self.queue.remove(change[1])
+            elif change[1] == self.user_id:
+                self.queue.schedule(change[2], now)
+        self.arm()
@@ -1,7 +1,8 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                            QTableWidget, QHeaderView, QAbstractItemView)
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QTableWidget,
+                            QHeaderView, QAbstractItemView,
+                            QStyledItemDelegate, QStyleOptionButton, QStyle,
+                            QApplication)
+from PyQt5.QtCore import Qt, QSize, QRect, QEvent, pyqtSignal
 
 class BaseTableView(QWidget):
     def __init__(self, parent=None):
@@ -32,40 +33,72 @@ class BaseTableView(QWidget):
         
         return table
 
-    def create_action_button(self, icon_path, text, action_type="true"):
-        """Create a consistently styled action button"""
-        button = QPushButton()
-        button.setProperty("action", action_type)
-        
-        # Set icon if provided
-        if icon_path:
-            button.setIcon(QIcon(icon_path))
-            button.setIconSize(QSize(16, 16))
-        
-        # Set text if provided
-        if text:
-            button.setText(text)
-        
-        # Set fixed size for consistent button dimensions
-        button.setFixedSize(QSize(100, 36))
-        
-        return button
+class RowActionsDelegate(QStyledItemDelegate):
+    """Paints Edit/Delete buttons in a cell and reports clicks by row.
 
-    def create_action_layout(self, edit_callback=None, delete_callback=None):
-        """Create a layout with edit and delete buttons"""
-        layout = QHBoxLayout()
-        layout.setSpacing(8)
-        layout.setContentsMargins(4, 4, 4, 4)
-        
-        if edit_callback:
-            edit_btn = self.create_action_button(":/icons/edit.svg", "Edit")
-            edit_btn.clicked.connect(edit_callback)
-            layout.addWidget(edit_btn)
-        
-        if delete_callback:
-            delete_btn = self.create_action_button(":/icons/delete.svg", "Delete", "delete")
-            delete_btn.clicked.connect(delete_callback)
-            layout.addWidget(delete_btn)
-        
-        layout.addStretch()
-        return layout
+    One delegate serves every row, so no per-row widgets are created.
+    """
+    edit_requested = pyqtSignal(int)
+    delete_requested = pyqtSignal(int)
+
+    BUTTONS = (("edit", "Edit"), ("delete", "Del"))
+    BUTTON_WIDTH = 44
+    BUTTON_HEIGHT = 26
+    SPACING = 4
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None
+
+    def button_rects(self, rect):
+        height = min(self.BUTTON_HEIGHT, rect.height() - 4)
+        top = rect.top() + (rect.height() - height) // 2
+        left = rect.left() + self.SPACING
+        rects = []
+        for action, _ in self.BUTTONS:
+            rects.append((action, QRect(left, top, self.BUTTON_WIDTH, height)))
+            left += self.BUTTON_WIDTH + self.SPACING
+        return rects
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        labels = dict(self.BUTTONS)
+        for action, rect in self.button_rects(option.rect):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = labels[action]
+            button.state = QStyle.State_Enabled
+            if self._pressed == (index.row(), action):
+                button.state |= QStyle.State_Sunken
+            else:
+                button.state |= QStyle.State_Raised
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+
+    def sizeHint(self, option, index):
+        width = len(self.BUTTONS) * (self.BUTTON_WIDTH + self.SPACING) + self.SPACING
+        return QSize(width, self.BUTTON_HEIGHT + 4)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+        hit = None
+        for action, rect in self.button_rects(option.rect):
+            if rect.contains(event.pos()):
+                hit = (index.row(), action)
+        if option.widget is not None:
+            option.widget.viewport().update(option.rect)
+        if event.type() == QEvent.MouseButtonPress:
+            self._pressed = hit
+            return hit is not None
+        pressed, self._pressed = self._pressed, None
+        if hit is None or hit != pressed:
+            return pressed is not None
+        if hit[1] == "edit":
+            self.edit_requested.emit(index.row())
+        else:
+            self.delete_requested.emit(index.row())
+        return True
@@ -1,19 +1,16 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                            QTextEdit, QComboBox, QLineEdit, QLabel, QDialog)
 from PyQt5.QtCore import Qt
+from functools import partial
 import json
-from langchain_community.chat_models import ChatOpenAI
-from langchain_community.llms import Ollama
-from langchain.callbacks.base import BaseCallbackHandler
-from langchain_core.messages import HumanMessage, AIMessage
-
-class StreamHandler(BaseCallbackHandler):
-    def __init__(self, text_widget):
-        self.text_widget = text_widget
-
-    def on_llm_new_token(self, token: str, **kwargs):
-        self.text_widget.insertPlainText(token)
-        self.text_widget.ensureCursorVisible()
+from models.chat_message import ChatMessage
+from services.ai_providers import get_client
+from services.chat_history import add_message, latest_conversation, page, restore_turns
+from services.chat_memory import ConversationMemory
+from services.llm_cache import ResponseCache, cache_key, llm_params
+from services.retrieval import Retriever, add_context
+from ui.chat_stream import ChatStream
+from ui.chat_transcript import ChatTranscript
 
 class AISettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -64,7 +61,7 @@ class AISettingsDialog(QDialog):
             self.api_label.setText("URL (default: http://localhost:11434):")
         else:
             self.model_combo.setEditText("")
-            self.api_label.setText("API Endpoint:")
+            self.api_label.setText("OpenAI-compatible base URL (e.g. http://localhost:8000/v1):")
 
     def load_settings(self):
         try:
@@ -87,9 +84,32 @@ class AISettingsDialog(QDialog):
         self.accept()
 
 class ChatView(QWidget):
+    # Tables whose changes make this view stale
+    depends_on = set()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self.cache = ResponseCache(parent.engine) if parent is not None else None
+        if self.cache is not None and not self.cache.enabled:
+            self.cache = None
+        # Puts the user's most relevant contacts and tasks in each prompt
+        self.retriever = Retriever(parent.engine) if parent is not None else None
+        self.queries = parent.queries if parent is not None else None
+        self.conversation_id = None
+        # Highest conversation number of the user, once loaded
+        self.last_conversation_id = None
+        # Messages waiting to be stored, saved one at a time in order
+        self.pending_saves = []
+        self.save_owner = object()
+        self.memory = ConversationMemory()
+        self.ai = None
+        self.question = None
+        self.stream = ChatStream(self)
+        self.stream.text_ready.connect(self.append_reply)
+        self.stream.finished.connect(self.reply_finished)
+        self.stream.failed.connect(self.reply_failed)
+        self.stream.cancelled.connect(self.reply_cancelled)
         self.setup_ui()
         self.load_settings()
 
@@ -101,12 +121,16 @@ class ChatView(QWidget):
         settings_btn = QPushButton("AI Settings")
         settings_btn.clicked.connect(self.show_settings)
         settings_layout.addWidget(settings_btn)
+        new_chat_btn = QPushButton("New Chat")
+        new_chat_btn.clicked.connect(self.new_conversation)
+        settings_layout.addWidget(new_chat_btn)
         settings_layout.addStretch()
+        self.cache_label = QLabel()
+        settings_layout.addWidget(self.cache_label)
         layout.addLayout(settings_layout)
 
-        # Chat display
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
+        # Chat display; holds a window of the stored conversation
+        self.chat_display = ChatTranscript()
         layout.addWidget(self.chat_display)
 
         # Input area
@@ -115,9 +139,14 @@ class ChatView(QWidget):
         self.input_field.setMaximumHeight(100)
         input_layout.addWidget(self.input_field)
 
-        send_button = QPushButton("Send")
-        send_button.clicked.connect(self.send_message)
-        input_layout.addWidget(send_button)
+        self.send_button = QPushButton("Send")
+        self.send_button.clicked.connect(self.send_message)
+        input_layout.addWidget(self.send_button)
+
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.stop_generation)
+        input_layout.addWidget(self.stop_button)
 
         layout.addLayout(input_layout)
         self.setLayout(layout)
@@ -134,48 +163,163 @@ class ChatView(QWidget):
             }
 
     def setup_ai(self):
-        if self.settings["provider"] == "OpenAI":
-            return ChatOpenAI(
-                model_name=self.settings["model"],
-                openai_api_key=self.settings["api_key"],
-                streaming=True,
-                callbacks=[StreamHandler(self.chat_display)]
-            )
-        elif self.settings["provider"] == "Ollama":
-            base_url = self.settings["api_key"] or "http://localhost:11434"
-            return Ollama(
-                base_url=base_url,
-                model=self.settings["model"],
-                callbacks=[StreamHandler(self.chat_display)]
-            )
-        else:
-            raise NotImplementedError("Custom AI providers not yet implemented")
+        return get_client(self.settings)
 
     def send_message(self):
         message = self.input_field.toPlainText().strip()
-        if not message:
+        # Sending waits for the conversation to load, which numbers new ones
+        if not message or self.queries is not None and self.queries.has_pending(self):
             return
 
-        # Display user message
-        self.chat_display.append(f"You: {message}\n")
-        self.chat_display.append("AI: ")
-        
         try:
             ai = self.setup_ai()
-            messages = [HumanMessage(content=message)]
-            ai.invoke(messages)
-            self.chat_display.append("\n\n")
         except Exception as e:
-            self.chat_display.append(f"Error: {str(e)}\n\n")
+            self.chat_display.add_notice(f"Error: {str(e)}")
+            return
 
+        # Display user message
+        self.save_message(ChatMessage.USER, message, self.chat_display.add_message(ChatMessage.USER, message))
+        self.chat_display.add_message(ChatMessage.ASSISTANT, "", streaming=True)
         self.input_field.clear()
 
+        # Generation runs on a worker; tokens arrive per frame via append_reply
+        self.ai = ai
+        self.question = message
+        provider, model, params = self.settings["provider"], self.settings["model"], llm_params(ai)
+        key = lambda messages: cache_key(provider, model, messages, params)
+        prepare = None
+        if self.retriever is not None and self.parent.user is not None:
+            prepare = partial(add_context, self.retriever, self.parent.user.id, message)
+        self.stream.start(ai, self.memory.messages(message), self.cache, key, prepare)
+        self.set_generating(True)
+
+    def save_message(self, role, content, handle):
+        """Store a message of the current conversation on the worker pool.
+
+        Saves run one after another so ids follow the conversation order;
+        the transcript gets each id through handle.
+        """
+        user_id = self.user_id()
+        if self.queries is None or user_id is None:
+            self.chat_display.set_id(handle, None)
+            return
+        if self.conversation_id is None:
+            # Conversations exist once their first message is stored
+            self.conversation_id = (self.last_conversation_id or 0) + 1
+            self.last_conversation_id = self.conversation_id
+            self.chat_display.conversation_id = self.conversation_id
+        conversation_id = self.conversation_id
+        self.pending_saves.append((
+            lambda session: add_message(session, user_id, conversation_id, role, content),
+            handle,
+        ))
+        if len(self.pending_saves) == 1:
+            self.save_next()
+
+    def save_next(self):
+        if not self.pending_saves:
+            return
+        save, handle = self.pending_saves[0]
+        self.queries.submit(self.save_owner, save,
+                            lambda message_id: self.message_saved(handle, message_id),
+                            on_error=self.save_failed)
+
+    def message_saved(self, handle, message_id):
+        self.pending_saves.pop(0)
+        self.chat_display.set_id(handle, message_id)
+        self.save_next()
+
+    def save_failed(self, error):
+        self.pending_saves.pop(0)
+        self.chat_display.add_notice(f"Error: could not save the message: {error}")
+        self.save_next()
+
+    def append_reply(self, text):
+        self.chat_display.append_to_last(text)
+
+    def reply_finished(self, text=""):
+        self.save_message(ChatMessage.ASSISTANT, text, self.chat_display.finish_streaming())
+        self.set_generating(False)
+        self.memory.add_turn(self.question, text)
+        self.update_cache_label()
+        if self.memory.needs_compaction():
+            memory, ai = self.memory, self.ai
+            self.stream.run_background(lambda: memory.compact(ai))
+
+    def reply_failed(self, error):
+        self.chat_display.add_notice(f"Error: {str(error)}")
+        self.set_generating(False)
+
+    def reply_cancelled(self):
+        self.chat_display.add_notice("[Stopped]")
+        self.set_generating(False)
+
+    def update_cache_label(self):
+        if self.cache is not None:
+            self.cache_label.setText(f"Cache: {self.cache.hits} hits, {self.cache.misses} misses")
+
+    def stop_generation(self):
+        self.stream.cancel()
+
+    def set_generating(self, generating):
+        self.send_button.setEnabled(not generating)
+        self.stop_button.setEnabled(generating)
+
     def show_settings(self):
         dialog = AISettingsDialog(self)
         if dialog.exec():
             self.load_settings()
 
+    def new_conversation(self):
+        self.stream.cancel()
+        self.memory.clear()
+        # Numbered when its first message is stored
+        self.conversation_id = None
+        user_id = self.user_id()
+        self.chat_display.show_conversation(self.queries, user_id, None)
+        if self.queries is not None and self.queries.has_pending(self):
+            # The latest conversation was still loading; only its number is needed now
+            self.queries.submit(self, lambda session: latest_conversation(session, user_id),
+                                self.numbered, on_error=self.conversation_failed)
+
+    def numbered(self, last_conversation_id):
+        self.last_conversation_id = last_conversation_id
+        self.set_generating(False)
+
+    @staticmethod
+    def load_conversation(session, user_id):
+        # Runs on a worker thread
+        conversation_id = latest_conversation(session, user_id)
+        rows = page(session, user_id, conversation_id) if conversation_id is not None else []
+        return conversation_id, rows
+
+    def conversation_loaded(self, user_id, conversation_id, rows):
+        self.conversation_id = self.last_conversation_id = conversation_id
+        self.chat_display.show_conversation(self.queries, user_id, conversation_id, rows)
+        restore_turns(self.memory, rows)
+        self.set_generating(False)
+
+    def conversation_failed(self, error):
+        self.chat_display.add_notice(f"Error: could not load the conversation: {error}")
+        self.set_generating(False)
+
+    def user_id(self):
+        return self.parent.user.id if self.parent is not None and self.parent.user is not None else None
+
     def update_view(self):
-        # Clear chat history when user changes
-        self.chat_display.clear()
+        # Pick up the user's latest conversation where it left off
+        self.stream.cancel()
+        self.memory.clear()
+        user_id = self.user_id()
+        self.conversation_id = self.last_conversation_id = None
+        self.chat_display.show_conversation(self.queries, user_id, None)
+        if self.queries is not None and user_id is not None:
+            self.send_button.setEnabled(False)
+            self.queries.submit(self, lambda session: self.load_conversation(session, user_id),
+                                lambda result: self.conversation_loaded(user_id, *result),
+                                on_error=self.conversation_failed)
         self.load_settings()
+        if self.retriever is not None and self.parent.user is not None:
+            # Index new and changed records before the first question needs them
+            retriever, user_id = self.retriever, self.parent.user.id
+            self.stream.run_background(lambda: retriever.sync(user_id))
@@ -0,0 +1,77 @@
+from PyQt5.QtWidgets import QLineEdit, QCompleter
+from PyQt5.QtCore import QStringListModel, QModelIndex
+from services.typeahead import contact_indexes, normalize
+
+class ContactPicker(QLineEdit):
+    """Line edit that suggests the owner's contacts as the user types.
+
+    Suggestions come from the in-memory contact index, so only the top
+    matches for the current text are ever put into the completer.
+    """
+    SUGGESTIONS = 10
+
+    def __init__(self, queries, owner_id, parent=None):
+        super().__init__(parent)
+        self.queries = queries
+        self.owner_id = owner_id
+        self._contact_id = None
+        self._suggestions = []
+        self._index = contact_indexes.get(owner_id)
+
+        self.setPlaceholderText("No contact (type to search)")
+        self.setClearButtonEnabled(True)
+
+        self._model = QStringListModel(self)
+        self._completer = QCompleter(self._model, self)
+        self._completer.setWidget(self)
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.activated[QModelIndex].connect(self.select_suggestion)
+        self.textEdited.connect(self.update_suggestions)
+
+        if self._index is None:
+            self.queries.submit(
+                self,
+                lambda session: contact_indexes.build(session, owner_id),
+                self.index_ready
+            )
+
+    def index_ready(self, index):
+        self._index = index
+        if self.hasFocus() and self.text():
+            self.update_suggestions(self.text())
+
+    def update_suggestions(self, text):
+        self._contact_id = None
+        if self._index is None:
+            return
+        self._suggestions = self._index.search(text, self.SUGGESTIONS)
+        self._model.setStringList([suggestion.label for suggestion in self._suggestions])
+        if self._suggestions:
+            self._completer.complete()
+        else:
+            self._completer.popup().hide()
+
+    def select_suggestion(self, index):
+        suggestion = self._suggestions[index.row()]
+        self.set_contact(suggestion.id, suggestion.label)
+
+    def set_contact(self, contact_id, label):
+        self._contact_id = contact_id
+        self.setText(label if contact_id is not None else "")
+
+    def contact_id(self):
+        """The picked contact, or the one contact whose name, email or label was typed"""
+        if not self.text():
+            return None
+        if self._contact_id is None and self._index is not None:
+            self._contact_id = self._resolve(self.text())
+        return self._contact_id
+
+    def _resolve(self, text):
+        wanted = normalize(text)
+        matches = set()
+        for suggestion in self._index.search(text, self.SUGGESTIONS):
+            name, _, email = suggestion.label.partition(" <")
+            if wanted in (normalize(suggestion.label), normalize(name), normalize(email)):
+                matches.add(suggestion.id)
+        return matches.pop() if len(matches) == 1 else None
@@ -1,10 +1,15 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QLabel, QTableWidget, QTableWidgetItem, QDialog,
+                             QLabel, QTableView, QDialog, QAbstractItemView,
                              QFormLayout, QLineEdit, QTextEdit, QHeaderView,
-                             QSizePolicy)
+                             QSizePolicy, QFileDialog, QMessageBox)
 from PyQt5.QtCore import Qt
-from models.base import get_session
+from models import events
+from models.base import session_scope
 from models.contact import Contact
+from .table_models import ContactTableModel
+from .base_view import RowActionsDelegate
+from .export_dialog import ExportDialog
+from .import_dialog import ImportDialog
 
 class ContactDialog(QDialog):
     def __init__(self, parent=None, contact=None):
@@ -62,10 +67,14 @@ class ContactDialog(QDialog):
             self.notes.setText(self.contact.notes)
 
 class ContactsView(QWidget):
+    # Tables whose changes make this view stale
+    depends_on = {"contacts"}
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.engine = parent.engine
+        self.queries = parent.queries
         self.init_ui()
 
     def init_ui(self):
@@ -83,20 +92,41 @@ class ContactsView(QWidget):
         add_btn.setMaximumWidth(100)  # Limit button width
         add_btn.clicked.connect(self.add_contact)
         header_layout.addWidget(add_btn)
+
+        import_btn = QPushButton("Import CSV")
+        import_btn.setMaximumWidth(100)
+        import_btn.clicked.connect(self.import_contacts)
+        header_layout.addWidget(import_btn)
+
+        duplicates_btn = QPushButton("Duplicates")
+        duplicates_btn.setMaximumWidth(100)
+        duplicates_btn.clicked.connect(self.review_duplicates)
+        header_layout.addWidget(duplicates_btn)
+
+        export_btn = QPushButton("Export CSV")
+        export_btn.setMaximumWidth(100)
+        export_btn.clicked.connect(self.export_contacts)
+        header_layout.addWidget(export_btn)
         header_layout.addStretch()
 
         layout.addLayout(header_layout)
 
-        # Contacts table
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "First Name", "Last Name", "Email", "Phone", "Company",
-            "Position", "Address", "Notes", "Actions"
-        ])
+        # Contacts table, rows are paged in by the model as the user scrolls
+        self.model = ContactTableModel(self.queries, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.actions_delegate = RowActionsDelegate(self.table)
+        self.actions_delegate.edit_requested.connect(self.edit_contact)
+        self.actions_delegate.delete_requested.connect(self.delete_contact)
+        self.table.setItemDelegateForColumn(8, self.actions_delegate)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.horizontalHeader().setStretchLastSection(False)  # Don't stretch last column
         self.table.horizontalHeader().setSectionResizeMode(8, QHeaderView.Fixed)  # Fix actions column width
         self.table.setColumnWidth(8, 100)  # Set actions column width
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # Make table expand
         layout.addWidget(self.table)
 
@@ -106,48 +136,44 @@ class ContactsView(QWidget):
         if not self.parent.user:
             return
 
-        session = get_session(self.engine)
-        contacts = session.query(Contact).filter_by(owner_id=self.parent.user.id).all()
+        self.model.set_user(self.parent.user.id)
 
-        self.table.setRowCount(len(contacts))
-        for row, contact in enumerate(contacts):
-            self.table.setItem(row, 0, QTableWidgetItem(contact.first_name))
-            self.table.setItem(row, 1, QTableWidgetItem(contact.last_name))
-            self.table.setItem(row, 2, QTableWidgetItem(contact.email))
-            self.table.setItem(row, 3, QTableWidgetItem(contact.phone))
-            self.table.setItem(row, 4, QTableWidgetItem(contact.company))
-            self.table.setItem(row, 5, QTableWidgetItem(contact.position))
-            self.table.setItem(row, 6, QTableWidgetItem(contact.address))
-            self.table.setItem(row, 7, QTableWidgetItem(contact.notes))
+    def select_record(self, record_id):
+        """Load rows down to record_id, then scroll to and select it"""
+        self.model.load_through(record_id, self.select_row)
 
-            # Create action buttons with smaller size
-            actions_layout = QHBoxLayout()
-            actions_layout.setSpacing(2)
-            actions_layout.setContentsMargins(2, 2, 2, 2)
-
-            edit_btn = QPushButton("Edit")
-            edit_btn.setMaximumWidth(12)
-            edit_btn.setMaximumHeight(24)
-            delete_btn = QPushButton("Del")
-            delete_btn.setMaximumWidth(12)
-            delete_btn.setMaximumHeight(24)
-
-            edit_btn.clicked.connect(lambda checked, c=contact: self.edit_contact(c))
-            delete_btn.clicked.connect(lambda checked, c=contact: self.delete_contact(c))
+    def select_row(self, row):
+        if row is None:
+            return
+        self.table.selectRow(row)
+        self.table.scrollTo(self.model.index(row, 0))
 
-            actions_layout.addWidget(edit_btn)
-            actions_layout.addWidget(delete_btn)
+    def import_contacts(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Contacts", "", "CSV files (*.csv)")
+        if not path:
+            return
+        try:
+            dialog = ImportDialog(self, path)
+        except (OSError, UnicodeDecodeError) as error:
+            QMessageBox.critical(self, "Error", f"Could not read {path}: {error}")
+            return
+        if dialog.exec_():
+            self.update_view()
 
-            actions_widget = QWidget()
-            actions_widget.setLayout(actions_layout)
-            self.table.setCellWidget(row, 8, actions_widget)
+    def review_duplicates(self):
+        # Duplicate matching needs pandas, which is too slow to load at startup
+        from .duplicates_dialog import DuplicatesDialog
+        dialog = DuplicatesDialog(self)
+        dialog.exec_()
+        if dialog.merged:
+            self.update_view()
 
-        session.close()
+    def export_contacts(self):
+        ExportDialog(self, "contacts").exec_()
 
     def add_contact(self):
         dialog = ContactDialog(self)
         if dialog.exec_():
-            session = get_session(self.engine)
             contact = Contact(
                 first_name=dialog.first_name.text(),
                 last_name=dialog.last_name.text(),
@@ -159,32 +185,28 @@ class ContactsView(QWidget):
                 notes=dialog.notes.toPlainText(),
                 owner_id=self.parent.user.id
             )
-            session.add(contact)
-            session.commit()
-            session.close()
-            self.update_view()
+            with events.origin(self), session_scope(self.engine) as session:
+                session.add(contact)
+            self.model.insert_object(contact)
 
-    def edit_contact(self, contact):
+    def edit_contact(self, row):
+        contact = self.model.row_object(row)
         dialog = ContactDialog(self, contact)
         if dialog.exec_():
-            session = get_session(self.engine)
-            contact = session.merge(contact)
-            contact.first_name = dialog.first_name.text()
-            contact.last_name = dialog.last_name.text()
-            contact.email = dialog.email.text()
-            contact.phone = dialog.phone.text()
-            contact.company = dialog.company.text()
-            contact.position = dialog.position.text()
-            contact.address = dialog.address.toPlainText()
-            contact.notes = dialog.notes.toPlainText()
-            session.commit()
-            session.close()
-            self.update_view()
-
-    def delete_contact(self, contact):
-        session = get_session(self.engine)
-        contact = session.merge(contact)
-        session.delete(contact)
-        session.commit()
-        session.close()
-        self.update_view()
+            with events.origin(self), session_scope(self.engine) as session:
+                contact = session.merge(contact)
+                contact.first_name = dialog.first_name.text()
+                contact.last_name = dialog.last_name.text()
+                contact.email = dialog.email.text()
+                contact.phone = dialog.phone.text()
+                contact.company = dialog.company.text()
+                contact.position = dialog.position.text()
+                contact.address = dialog.address.toPlainText()
+                contact.notes = dialog.notes.toPlainText()
+            self.model.update_object(row, contact)
+
+    def delete_contact(self, row):
+        contact = self.model.row_object(row)
+        with events.origin(self), session_scope(self.engine) as session:
+            session.delete(session.merge(contact))
+        self.model.remove_row(row)
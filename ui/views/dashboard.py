@@ -2,10 +2,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QScrollArea, QGraphicsDropShadowEffect)
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QIcon, QColor
-from models.base import get_session
-from models.task import Task
-from models.contact import Contact
-from datetime import datetime, timedelta
+from services.stats import stats_cache
 import ui.resources_rc
 
 class StatCard(QFrame):
@@ -53,10 +50,14 @@ class StatCard(QFrame):
         self.value_label.setText(str(value))
 
 class DashboardView(QWidget):
+    # Tables whose changes make this view stale
+    depends_on = {"contacts", "tasks"}
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.engine = parent.engine
+        self.queries = parent.queries
         self.init_ui()
 
     def init_ui(self):
@@ -143,23 +144,16 @@ class DashboardView(QWidget):
         if not self.parent.user:
             return
 
-        session = get_session(self.engine)
-        
-        # Update statistics
-        contact_count = session.query(Contact).filter_by(owner_id=self.parent.user.id).count()
-        active_tasks = session.query(Task).filter_by(
-            assigned_to_id=self.parent.user.id
-        ).filter(Task.status != 'completed').count()
-        
-        overdue_tasks = session.query(Task).filter_by(
-            assigned_to_id=self.parent.user.id
-        ).filter(
-            Task.due_date < datetime.utcnow()
-        ).filter(Task.status != 'completed').count()
+        user_id = self.parent.user.id
+        self.queries.submit(self, lambda session: self.load_stats(session, user_id), self.show_stats)
 
-        # Update card values
-        self.contacts_card.update_value(contact_count)
-        self.tasks_card.update_value(active_tasks)
-        self.overdue_card.update_value(overdue_tasks)
+    @staticmethod
+    def load_stats(session, user_id):
+        # Runs on a worker thread; served from memory unless counters are stale
+        return stats_cache.get(session, user_id)
 
-        session.close()
+    def show_stats(self, stats):
+        # Update card values
+        self.contacts_card.update_value(stats.contacts)
+        self.tasks_card.update_value(stats.active_tasks)
+        self.overdue_card.update_value(stats.overdue_tasks)
@@ -0,0 +1,115 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QTableWidget, QTableWidgetItem, QAbstractItemView,
+                             QHeaderView, QMessageBox)
+from models.base import session_scope
+from services.dedup import dismiss_candidate, merge_contacts, pending_candidates, refresh_candidates
+
+def describe(contact):
+    details = [value for value in (contact.email, contact.phone, contact.company) if value]
+    return f"{contact.full_name}\n{' | '.join(details)}"
+
+class DuplicatesDialog(QDialog):
+    """Review queue for likely duplicate contacts"""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.engine = parent.engine
+        self.queries = parent.queries
+        self.owner_id = parent.parent.user.id
+        self.candidates = []
+        self.merged = 0
+        self.init_ui()
+        self.scan()
+
+    def init_ui(self):
+        self.setWindowTitle("Duplicate Contacts")
+        self.resize(800, 500)
+        layout = QVBoxLayout()
+
+        self.status_label = QLabel("Scanning contacts...")
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Keep", "Merge Into It", "Score", "Matched On"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        button_box = QHBoxLayout()
+        self.merge_btn = QPushButton("Merge")
+        self.dismiss_btn = QPushButton("Not Duplicates")
+        close_btn = QPushButton("Close")
+        self.merge_btn.clicked.connect(self.merge_selected)
+        self.dismiss_btn.clicked.connect(self.dismiss_selected)
+        close_btn.clicked.connect(self.accept)
+        button_box.addWidget(self.merge_btn)
+        button_box.addWidget(self.dismiss_btn)
+        button_box.addStretch()
+        button_box.addWidget(close_btn)
+        layout.addLayout(button_box)
+
+        self.setLayout(layout)
+        self.set_busy(True)
+
+    def set_busy(self, busy):
+        self.merge_btn.setEnabled(not busy)
+        self.dismiss_btn.setEnabled(not busy)
+
+    def scan(self):
+        def rescan(session):
+            refresh_candidates(session, self.owner_id)
+            session.flush()
+            return pending_candidates(session, self.owner_id)
+        self.queries.submit(self, rescan, self.show_candidates, on_error=self.scan_failed)
+
+    def reload(self):
+        self.queries.submit(self, lambda session: pending_candidates(session, self.owner_id),
+                            self.show_candidates, on_error=self.scan_failed)
+
+    def show_candidates(self, candidates):
+        self.candidates = candidates
+        self.table.setRowCount(len(candidates))
+        for row, (candidate, contact, duplicate) in enumerate(candidates):
+            self.table.setItem(row, 0, QTableWidgetItem(describe(contact)))
+            self.table.setItem(row, 1, QTableWidgetItem(describe(duplicate)))
+            self.table.setItem(row, 2, QTableWidgetItem(f"{candidate.score:.2f}"))
+            self.table.setItem(row, 3, QTableWidgetItem(candidate.reasons or ""))
+        self.table.resizeRowsToContents()
+        self.status_label.setText(f"{len(candidates)} possible duplicates" if candidates
+                                  else "No duplicates found")
+        self.set_busy(False)
+
+    def scan_failed(self, error):
+        self.status_label.setText("Scan failed")
+        QMessageBox.critical(self, "Error", f"Duplicate scan failed: {error}")
+
+    def selected_candidate(self):
+        row = self.table.currentRow()
+        return self.candidates[row] if 0 <= row < len(self.candidates) else None
+
+    def merge_selected(self):
+        selected = self.selected_candidate()
+        if selected is None:
+            return
+        candidate, contact, duplicate = selected
+        with session_scope(self.engine) as session:
+            merge_contacts(session, contact.id, [duplicate.id])
+        self.merged += 1
+        self.set_busy(True)
+        self.reload()
+
+    def dismiss_selected(self):
+        selected = self.selected_candidate()
+        if selected is None:
+            return
+        with session_scope(self.engine) as session:
+            dismiss_candidate(session, selected[0].id)
+        self.set_busy(True)
+        self.reload()
+
+    def done(self, result):
+        self.queries.cancel(self)
+        super().done(result)
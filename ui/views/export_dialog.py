@@ -0,0 +1,150 @@
+import threading
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox,
+                             QCheckBox, QDateEdit, QPushButton, QFileDialog,
+                             QProgressDialog, QMessageBox, QLabel)
+from PyQt5.QtCore import Qt, QDate, pyqtSignal
+from datetime import datetime
+from models.task import TaskStatus
+from services.export import EXPORTS, ExportCancelled, export_csv
+
+class ExportDialog(QDialog):
+    """Pick columns and filters, then stream the export on the query pool"""
+    # Emitted from the worker thread, delivered queued on the GUI thread
+    progress_changed = pyqtSignal(int, int)
+
+    def __init__(self, parent, kind):
+        super().__init__(parent)
+        self.kind = kind
+        self.queries = parent.queries
+        self.owner_id = parent.parent.user.id
+        self.spec = EXPORTS[kind]
+        self.cancel_event = threading.Event()
+        self.progress = None
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle(f"Export {self.kind.title()}")
+        layout = QVBoxLayout()
+
+        columns_box = QGroupBox("Columns")
+        columns_layout = QGridLayout()
+        self.column_checks = {}
+        for position, (name, column) in enumerate(self.spec.columns.items()):
+            check = QCheckBox(column.header)
+            check.setChecked(name != "id")
+            self.column_checks[name] = check
+            columns_layout.addWidget(check, position // 3, position % 3)
+        columns_box.setLayout(columns_layout)
+        layout.addWidget(columns_box)
+
+        self.status_checks = {}
+        if self.kind == "tasks":
+            status_box = QGroupBox("Status")
+            status_layout = QHBoxLayout()
+            for status in TaskStatus:
+                check = QCheckBox(status.value)
+                check.setChecked(True)
+                self.status_checks[status] = check
+                status_layout.addWidget(check)
+            status_box.setLayout(status_layout)
+            layout.addWidget(status_box)
+
+        date_label = "Due date" if self.kind == "tasks" else "Created"
+        self.date_box = QGroupBox(f"{date_label} between")
+        self.date_box.setCheckable(True)
+        self.date_box.setChecked(False)
+        date_layout = QHBoxLayout()
+        self.since = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.until = QDateEdit(QDate.currentDate())
+        for edit in (self.since, self.until):
+            edit.setCalendarPopup(True)
+        date_layout.addWidget(self.since)
+        date_layout.addWidget(QLabel("and"))
+        date_layout.addWidget(self.until)
+        self.date_box.setLayout(date_layout)
+        layout.addWidget(self.date_box)
+
+        button_box = QHBoxLayout()
+        export_btn = QPushButton("Export")
+        cancel_btn = QPushButton("Cancel")
+        export_btn.clicked.connect(self.start_export)
+        cancel_btn.clicked.connect(self.reject)
+        button_box.addWidget(export_btn)
+        button_box.addWidget(cancel_btn)
+        layout.addLayout(button_box)
+
+        self.setLayout(layout)
+        self.progress_changed.connect(self.show_progress)
+
+    def options(self):
+        columns = [name for name, check in self.column_checks.items() if check.isChecked()]
+        statuses = [status for status, check in self.status_checks.items() if check.isChecked()]
+        since = until = None
+        if self.date_box.isChecked():
+            since = datetime.combine(self.since.date().toPyDate(), datetime.min.time())
+            # Inclusive of the whole end day
+            until = datetime.combine(self.until.date().addDays(1).toPyDate(), datetime.min.time())
+        return {
+            "columns": columns,
+            "owner_id": self.owner_id,
+            "statuses": statuses if len(statuses) < len(self.status_checks) else None,
+            "since": since,
+            "until": until,
+        }
+
+    def start_export(self):
+        options = self.options()
+        if not options["columns"]:
+            QMessageBox.warning(self, "Error", "Select at least one column")
+            return
+        if self.status_checks and options["statuses"] == []:
+            QMessageBox.warning(self, "Error", "Select at least one status")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export to CSV", f"{self.kind}.csv", "CSV files (*.csv)")
+        if not path:
+            return
+
+        self.cancel_event.clear()
+        self.progress = QProgressDialog("Exporting...", "Cancel", 0, 0, self)
+        self.progress.setWindowModality(Qt.WindowModal)
+        self.progress.setMinimumDuration(300)
+        self.progress.canceled.connect(self.cancel_event.set)
+        self.queries.submit(
+            self,
+            lambda session: export_csv(
+                session, self.kind, path,
+                progress=self.progress_changed.emit,
+                cancelled=self.cancel_event.is_set,
+                **options,
+            ),
+            lambda count: self.export_finished(count, path),
+            on_error=self.export_failed,
+        )
+
+    def reject(self):
+        # Closing the dialog stops a running export at its next chunk
+        self.cancel_event.set()
+        self.queries.cancel(self)
+        super().reject()
+
+    def show_progress(self, done, total):
+        if self.progress is None:
+            return
+        self.progress.setMaximum(max(total, 1))
+        self.progress.setValue(done)
+
+    def close_progress(self):
+        if self.progress is not None:
+            self.progress.canceled.disconnect(self.cancel_event.set)
+            self.progress.close()
+            self.progress = None
+
+    def export_finished(self, count, path):
+        self.close_progress()
+        QMessageBox.information(self, "Export", f"Exported {count} {self.kind} to {path}")
+        self.accept()
+
+    def export_failed(self, error):
+        self.close_progress()
+        if not isinstance(error, ExportCancelled):
+            QMessageBox.critical(self, "Error", f"Export failed: {error}")
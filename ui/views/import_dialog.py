@@ -0,0 +1,114 @@
+import threading
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QComboBox,
+                             QPushButton, QProgressDialog, QMessageBox, QLabel)
+from PyQt5.QtCore import Qt, pyqtSignal
+from services.contact_import import IMPORT_FIELDS, guess_mapping, import_contacts, read_headers
+
+class ImportDialog(QDialog):
+    """Map CSV columns to contact fields, then import on the query pool"""
+    # Emitted from the worker thread, delivered queued on the GUI thread
+    progress_changed = pyqtSignal("qint64", "qint64")
+
+    def __init__(self, parent, path):
+        super().__init__(parent)
+        self.path = path
+        self.engine = parent.engine
+        self.queries = parent.queries
+        self.owner_id = parent.parent.user.id
+        self.headers = read_headers(path)
+        self.cancel_event = threading.Event()
+        self.progress = None
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("Import Contacts")
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Match the file's columns to contact fields. "
+                                "Contacts whose email or phone already exists are skipped."))
+
+        form = QFormLayout()
+        guessed = guess_mapping(self.headers)
+        self.field_combos = {}
+        for field in IMPORT_FIELDS:
+            combo = QComboBox()
+            combo.addItem("(skip)", None)
+            for position, header in enumerate(self.headers):
+                combo.addItem(header, position)
+            if field in guessed:
+                combo.setCurrentIndex(guessed[field] + 1)
+            self.field_combos[field] = combo
+            form.addRow(f"{field.replace('_', ' ').title()}:", combo)
+        layout.addLayout(form)
+
+        button_box = QHBoxLayout()
+        import_btn = QPushButton("Import")
+        cancel_btn = QPushButton("Cancel")
+        import_btn.clicked.connect(self.start_import)
+        cancel_btn.clicked.connect(self.reject)
+        button_box.addWidget(import_btn)
+        button_box.addWidget(cancel_btn)
+        layout.addLayout(button_box)
+
+        self.setLayout(layout)
+        self.progress_changed.connect(self.show_progress)
+
+    def mapping(self):
+        return {field: combo.currentData() for field, combo in self.field_combos.items()}
+
+    def start_import(self):
+        mapping = self.mapping()
+        if mapping["first_name"] is None and mapping["last_name"] is None:
+            QMessageBox.warning(self, "Error", "Choose a column for the first or last name")
+            return
+
+        self.cancel_event.clear()
+        self.progress = QProgressDialog("Importing contacts...", "Cancel", 0, 0, self)
+        self.progress.setWindowModality(Qt.WindowModal)
+        self.progress.setMinimumDuration(300)
+        self.progress.canceled.connect(self.cancel_event.set)
+        # The importer commits in batches on its own connections
+        self.queries.submit(
+            self,
+            lambda session: import_contacts(
+                self.engine, self.path, self.owner_id, mapping,
+                progress=self.progress_changed.emit,
+                cancelled=self.cancel_event.is_set,
+            ),
+            self.import_finished,
+            on_error=self.import_failed,
+        )
+
+    def reject(self):
+        # Closing the dialog stops a running import after its current batch
+        self.cancel_event.set()
+        self.queries.cancel(self)
+        super().reject()
+
+    def show_progress(self, done, total):
+        if self.progress is None:
+            return
+        # Byte counts can exceed a QProgressDialog's int range, so show per mille
+        self.progress.setMaximum(1000)
+        self.progress.setValue(done * 1000 // max(total, 1))
+
+    def close_progress(self):
+        if self.progress is not None:
+            self.progress.canceled.disconnect(self.cancel_event.set)
+            self.progress.close()
+            self.progress = None
+
+    def import_finished(self, result):
+        self.close_progress()
+        message = f"Imported {result.inserted} contacts."
+        if result.duplicates:
+            message += f"\n{result.duplicates} duplicates skipped."
+        if result.skipped:
+            message += f"\n{result.skipped} rows without a name skipped."
+        if result.cancelled:
+            message = "Import cancelled.\n" + message
+        QMessageBox.information(self, "Import", message)
+        self.accept()
+
+    def import_failed(self, error):
+        self.close_progress()
+        QMessageBox.critical(self, "Error", f"Import failed: {error}")
@@ -0,0 +1,290 @@
+from collections import namedtuple
+import enum
+import sys
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from sqlalchemy import and_, or_
+from models.contact import Contact
+from models.task import Task
+from services.tasks import task_query
+
+# attr doubles as the sort column; formatter turns the row object into text
+Column = namedtuple("Column", ["header", "attr", "formatter"], defaults=[None, None])
+
+def format_datetime(value):
+    return value.strftime("%Y-%m-%d %H:%M") if value else ""
+
+def keyset_filter(column, id_column, last_value, last_id, ascending=True):
+    """Predicate selecting rows after (last_value, last_id) in SQLite order.
+
+    SQLite sorts NULLs first when ascending and last when descending, so
+    the NULL group is handled explicitly to keep the predicate indexable.
+    """
+    if ascending:
+        if last_value is None:
+            return or_(and_(column.is_(None), id_column > last_id), column.isnot(None))
+        return or_(column > last_value, and_(column == last_value, id_column > last_id))
+    if last_value is None:
+        return and_(column.is_(None), id_column < last_id)
+    return or_(
+        column < last_value,
+        and_(column == last_value, id_column < last_id),
+        column.is_(None),
+    )
+
+class PagedTableModel(QAbstractTableModel):
+    """Table model that loads rows page by page with keyset pagination"""
+    entity = None
+    columns = []
+    default_sort = "id"
+    page_size = 200
+
+    def __init__(self, queries, parent=None):
+        super().__init__(parent)
+        self.queries = queries
+        # Page loads are keyed on the owning view so switching away cancels them
+        self.owner = parent if parent is not None else self
+        self.user_id = None
+        self._rows = []
+        self._exhausted = True
+        self._loading = False
+        self._sort_attr = self.default_sort
+        self._ascending = True
+
+    # Subclasses restrict the query to the current user
+    def base_query(self, session):
+        raise NotImplementedError
+
+    def set_user(self, user_id):
+        self.user_id = user_id
+        self.refresh()
+
+    def refresh(self):
+        self.queries.cancel(self.owner)
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = self.user_id is None
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def row_object(self, row):
+        return self._rows[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        column = self.columns[index.column()]
+        obj = self._rows[index.row()]
+        if column.formatter:
+            return column.formatter(obj)
+        if column.attr:
+            value = getattr(obj, column.attr)
+            return "" if value is None else str(value)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._loading = True
+        cursor = None
+        if self._rows:
+            last = self._rows[-1]
+            cursor = (getattr(last, self._sort_attr), last.id)
+        self.queries.submit(
+            self.owner,
+            lambda session: self.page_query(session, cursor).limit(self.page_size).all(),
+            self._append_page,
+            on_error=self._fetch_failed,
+            on_cancel=self._fetch_cancelled,
+        )
+
+    def page_query(self, session, cursor=None):
+        sort_column = getattr(self.entity, self._sort_attr)
+        id_column = self.entity.id
+        query = self.base_query(session)
+        if cursor is not None:
+            query = query.filter(keyset_filter(sort_column, id_column, *cursor, self._ascending))
+        if self._ascending:
+            return query.order_by(sort_column.asc(), id_column.asc())
+        return query.order_by(sort_column.desc(), id_column.desc())
+
+    def _fetch_cancelled(self):
+        self._loading = False
+
+    def _fetch_failed(self, error):
+        self._loading = False
+        self._exhausted = True
+        sys.excepthook(type(error), error, error.__traceback__)
+
+    def _append_page(self, page):
+        self._loading = False
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if not page:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def row_of(self, record_id):
+        for row, obj in enumerate(self._rows):
+            if obj.id == record_id:
+                return row
+        return None
+
+    def load_through(self, record_id, on_loaded):
+        """Load pages until record_id is among the rows, then call on_loaded(row).
+
+        row is None when the record is not in this table.
+        """
+        row = self.row_of(record_id)
+        if row is not None or self._exhausted:
+            on_loaded(row)
+            return
+        last = self._rows[-1] if self._rows else None
+        cursor = (getattr(last, self._sort_attr), last.id) if last else None
+        # Supersedes a page load in flight, which starts from the same cursor
+        self.queries.submit(
+            self.owner,
+            lambda session: self._pages_through(session, cursor, record_id),
+            lambda result: self._loaded_through(result, record_id, on_loaded),
+            on_error=self._fetch_failed,
+            on_cancel=self._fetch_cancelled,
+        )
+        self._loading = True
+
+    def _pages_through(self, session, cursor, record_id):
+        # Runs on a worker thread; the same keyset pages fetchMore would load
+        rows = []
+        while True:
+            page = self.page_query(session, cursor).limit(self.page_size).all()
+            rows.extend(page)
+            if len(page) < self.page_size:
+                return rows, True
+            if any(obj.id == record_id for obj in page):
+                return rows, False
+            cursor = (getattr(page[-1], self._sort_attr), page[-1].id)
+
+    def _loaded_through(self, result, record_id, on_loaded):
+        rows, exhausted = result
+        self._loading = False
+        self._exhausted = exhausted
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        on_loaded(self.row_of(record_id))
+
+    def sort_key(self, obj):
+        """Python equivalent of the SQL ordering used by page_query"""
+        value = getattr(obj, self._sort_attr)
+        if isinstance(value, enum.Enum):
+            value = value.name  # SQLAlchemy stores enums by name
+        return (value is not None, value if value is not None else 0, obj.id)
+
+    def insert_position(self, obj):
+        key = self.sort_key(obj)
+        low, high = 0, len(self._rows)
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = self.sort_key(self._rows[middle])
+            if (middle_key < key) if self._ascending else (middle_key > key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def insert_object(self, obj):
+        """Insert a new row at its sorted position without reloading.
+
+        Rows that sort after the last loaded row are left for fetchMore,
+        whose keyset cursor will pick them up.
+        """
+        row = self.insert_position(obj)
+        if row == len(self._rows) and not self._exhausted:
+            return None
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, obj)
+        self.endInsertRows()
+        return row
+
+    def update_object(self, row, obj):
+        """Replace the object at row, moving it if its sort key changed"""
+        before = row == 0 or self._compare_rows(self._rows[row - 1], obj)
+        if row == len(self._rows) - 1:
+            # The last loaded row is the keyset cursor, so it may only stay
+            # in place if nothing unloaded could sort before it
+            after = self._exhausted or self.sort_key(obj) == self.sort_key(self._rows[row])
+        else:
+            after = self._compare_rows(obj, self._rows[row + 1])
+        if before and after:
+            self._rows[row] = obj
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+            return row
+        self.remove_row(row)
+        return self.insert_object(obj)
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+    def _compare_rows(self, first, second):
+        if self._ascending:
+            return self.sort_key(first) <= self.sort_key(second)
+        return self.sort_key(first) >= self.sort_key(second)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        attr = self.columns[column].attr if 0 <= column < len(self.columns) else None
+        self._sort_attr = attr or self.default_sort
+        self._ascending = attr is None or order == Qt.AscendingOrder
+        self.refresh()
+
+class ContactTableModel(PagedTableModel):
+    entity = Contact
+    columns = [
+        Column("First Name", "first_name"),
+        Column("Last Name", "last_name"),
+        Column("Email", "email"),
+        Column("Phone", "phone"),
+        Column("Company", "company"),
+        Column("Position", "position"),
+        Column("Address", "address"),
+        Column("Notes", "notes"),
+        Column("Actions"),
+    ]
+
+    def base_query(self, session):
+        return session.query(Contact).filter(Contact.owner_id == self.user_id)
+
+class TaskTableModel(PagedTableModel):
+    entity = Task
+    columns = [
+        Column("Title", "title"),
+        Column("Status", "status", lambda task: task.status.value if task.status else ""),
+        Column("Priority", "priority", lambda task: task.priority.value if task.priority else ""),
+        Column("Due Date", "due_date", lambda task: format_datetime(task.due_date)),
+        Column("Contact", None, lambda task: task.contact.full_name if task.contact else ""),
+        Column("Reminder", "reminder_date", lambda task: format_datetime(task.reminder_date)),
+        Column("Actions"),
+    ]
+    default_sort = "due_date"
+
+    def base_query(self, session):
+        return task_query(session, self.user_id)
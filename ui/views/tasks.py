@@ -6,13 +6,18 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 sys.path.append(project_root)
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-                             QLabel, QTableWidget, QTableWidgetItem, QDialog,
+                             QLabel, QTableView, QDialog, QAbstractItemView,
                              QFormLayout, QLineEdit, QTextEdit, QComboBox,
-                             QDateTimeEdit, QHeaderView, QSizePolicy)
+                             QDateTimeEdit, QHeaderView, QSizePolicy, QMessageBox)
 from PyQt5.QtCore import Qt, QDateTime
-from models.base import get_session
+from models import events
+from models.base import session_scope
 from models.task import Task, TaskStatus, TaskPriority
-from models.contact import Contact
+from services.tasks import get_task
+from ui.views.table_models import TaskTableModel
+from ui.views.base_view import RowActionsDelegate
+from ui.views.contact_picker import ContactPicker
+from ui.views.export_dialog import ExportDialog
 
 class TaskDialog(QDialog):
     def __init__(self, parent=None, task=None):
@@ -41,8 +46,8 @@ class TaskDialog(QDialog):
         self.reminder_date = QDateTimeEdit(QDateTime.currentDateTime())
         self.reminder_date.setCalendarPopup(True)
         
-        self.contact = QComboBox()
-        self.load_contacts()
+        self.contact = ContactPicker(self.parent.queries, self.parent.parent.user.id, self)
+        self.finished.connect(lambda result: self.parent.queries.cancel(self.contact))
 
         # Add fields to layout
         layout.addRow("Title:", self.title)
@@ -58,7 +63,7 @@ class TaskDialog(QDialog):
         save_btn = QPushButton("Save")
         cancel_btn = QPushButton("Cancel")
 
-        save_btn.clicked.connect(self.accept)
+        save_btn.clicked.connect(self.save)
         cancel_btn.clicked.connect(self.reject)
 
         button_box.addWidget(save_btn)
@@ -78,25 +83,23 @@ class TaskDialog(QDialog):
             if self.task.reminder_date:
                 self.reminder_date.setDateTime(self.task.reminder_date)
             if self.task.contact:
-                self.contact.setCurrentText(self.task.contact.full_name)
+                self.contact.set_contact(self.task.contact_id, self.task.contact.full_name)
 
-    def load_contacts(self):
-        session = get_session(self.parent.parent.engine)
-        contacts = session.query(Contact).filter_by(
-            owner_id=self.parent.parent.user.id
-        ).all()
-        
-        self.contact.addItem("None", None)
-        for contact in contacts:
-            self.contact.addItem(contact.full_name, contact.id)
-        
-        session.close()
+    def save(self):
+        if self.contact.text() and self.contact.contact_id() is None:
+            QMessageBox.warning(self, "Error", "Pick a contact from the suggestions or clear the field")
+            return
+        self.accept()
 
 class TasksView(QWidget):
+    # Tables whose changes make this view stale
+    depends_on = {"tasks", "contacts"}
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.engine = parent.engine
+        self.queries = parent.queries
         self.init_ui()
 
     def init_ui(self):
@@ -114,26 +117,36 @@ class TasksView(QWidget):
         add_btn.setMaximumWidth(100)  # Limit button width
         add_btn.clicked.connect(self.add_task)
         header_layout.addWidget(add_btn)
+
+        export_btn = QPushButton("Export CSV")
+        export_btn.setMaximumWidth(100)
+        export_btn.clicked.connect(self.export_tasks)
+        header_layout.addWidget(export_btn)
         header_layout.addStretch()
 
         layout.addLayout(header_layout)
 
         
-        # Tasks table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "Title", "Status", "Priority", "Due Date", "Contact", "Reminder", "Actions"
-        ])
+        # Tasks table, rows are paged in by the model as the user scrolls
+        self.model = TaskTableModel(self.queries, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.actions_delegate = RowActionsDelegate(self.table)
+        self.actions_delegate.edit_requested.connect(self.edit_task)
+        self.actions_delegate.delete_requested.connect(self.delete_task)
+        self.table.setItemDelegateForColumn(6, self.actions_delegate)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
         # Set section resize mode to Stretch for all columns
-        for i in range(self.table.columnCount()):
-            self.table.horizontalHeader().setSectionResizeMode(i, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         # Make table expand and adjust automatically
         self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.table.horizontalHeader().setStretchLastSection(True)  # stretch last column
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
 
-        # Ensure rows adjust to content
-        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # Fixed row height keeps scrolling independent of row count
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         layout.addWidget(self.table)
 
         self.setLayout(layout)
@@ -143,53 +156,24 @@ class TasksView(QWidget):
         if not self.parent.user:
             return
 
-        session = get_session(self.engine)
-        tasks = session.query(Task).filter_by(assigned_to_id=self.parent.user.id).all()
-
-        self.table.setRowCount(len(tasks))
-        for row, task in enumerate(tasks):
-            self.table.setItem(row, 0, QTableWidgetItem(task.title))
-            self.table.setItem(row, 1, QTableWidgetItem(task.status.value))
-            self.table.setItem(row, 2, QTableWidgetItem(task.priority.value))
-            self.table.setItem(row, 3, QTableWidgetItem(
-                task.due_date.strftime("%Y-%m-%d %H:%M") if task.due_date else ""
-            ))
-            self.table.setItem(row, 4, QTableWidgetItem(
-                task.contact.full_name if task.contact else ""
-            ))
-            self.table.setItem(row, 5, QTableWidgetItem(
-                task.reminder_date.strftime("%Y-%m-%d %H:%M") if task.reminder_date else ""
-            ))
-
-           # Create action buttons with dynamic size
-            actions_layout = QHBoxLayout()
-            actions_layout.setSpacing(2)
-            actions_layout.setContentsMargins(2, 2, 2, 2)
-
-            edit_btn = QPushButton("Edit")
-            edit_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # Make button expand
-            edit_btn.setStyleSheet("min-height: 20px; max-height: 25px; min-width: 30px; max-width: 40px;")
-            delete_btn = QPushButton("Del")
-            delete_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # Make button expand
-            delete_btn.setStyleSheet("min-height: 20px; max-height: 25px; min-width: 30px; max-width: 40px;")
-
-            edit_btn.clicked.connect(lambda checked, t=task: self.edit_task(t))
-            delete_btn.clicked.connect(lambda checked, t=task: self.delete_task(t))
-
-            actions_layout.addWidget(edit_btn)
-            actions_layout.addWidget(delete_btn)
-
-            actions_widget = QWidget()
-            actions_widget.setLayout(actions_layout)
-            self.table.setCellWidget(row, 6, actions_widget)
-
-
-        session.close()
+        self.model.set_user(self.parent.user.id)
+
+    def select_record(self, record_id):
+        """Load rows down to record_id, then scroll to and select it"""
+        self.model.load_through(record_id, self.select_row)
+
+    def select_row(self, row):
+        if row is None:
+            return
+        self.table.selectRow(row)
+        self.table.scrollTo(self.model.index(row, 0))
+
+    def export_tasks(self):
+        ExportDialog(self, "tasks").exec_()
 
     def add_task(self):
         dialog = TaskDialog(self)
         if dialog.exec_():
-            session = get_session(self.engine)
             task = Task(
                 title=dialog.title.text(),
                 description=dialog.description.toPlainText(),
@@ -198,33 +182,34 @@ class TasksView(QWidget):
                 due_date=dialog.due_date.dateTime().toPyDateTime(),
                 reminder_date=dialog.reminder_date.dateTime().toPyDateTime(),
                 assigned_to_id=self.parent.user.id,
-                contact_id=dialog.contact.currentData()
+                contact_id=dialog.contact.contact_id()
             )
-            session.add(task)
-            session.commit()
-            session.close()
-            self.update_view()
-
-    def edit_task(self, task):
+            with events.origin(self), session_scope(self.engine) as session:
+                session.add(task)
+                session.flush()
+                task = get_task(session, task.id)
+            self.model.insert_object(task)
+
+    def edit_task(self, row):
+        task = self.model.row_object(row)
         dialog = TaskDialog(self, task)
         if dialog.exec_():
-            session = get_session(self.engine)
-            task = session.merge(task)
-            task.title = dialog.title.text()
-            task.description = dialog.description.toPlainText()
-            task.status = TaskStatus(dialog.status.currentText())
-            task.priority = TaskPriority(dialog.priority.currentText())
-            task.due_date = dialog.due_date.dateTime().toPyDateTime()
-            task.reminder_date = dialog.reminder_date.dateTime().toPyDateTime()
-            task.contact_id = dialog.contact.currentData()
-            session.commit()
-            session.close()
-            self.update_view()
-
-    def delete_task(self, task):
-        session = get_session(self.engine)
-        task = session.merge(task)
-        session.delete(task)
-        session.commit()
-        session.close()
-        self.update_view()
+            with events.origin(self), session_scope(self.engine) as session:
+                task = session.merge(task)
+                task.title = dialog.title.text()
+                task.description = dialog.description.toPlainText()
+                task.status = TaskStatus(dialog.status.currentText())
+                task.priority = TaskPriority(dialog.priority.currentText())
+                task.due_date = dialog.due_date.dateTime().toPyDateTime()
+                task.reminder_date = dialog.reminder_date.dateTime().toPyDateTime()
+                task.contact_id = dialog.contact.contact_id()
+                session.flush()
+                session.expire(task, ["contact"])
+                task = get_task(session, task.id)
+            self.model.update_object(row, task)
+
+    def delete_task(self, row):
+        task = self.model.row_object(row)
+        with events.origin(self), session_scope(self.engine) as session:
+            session.delete(session.merge(task))
+        self.model.remove_row(row)
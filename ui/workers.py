@@ -0,0 +1,126 @@
+import sys
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from models.base import session_scope
+
+class QueryJob(QRunnable):
+    """A unit of database work run on the pool with its own session"""
+
+    def __init__(self, runner, owner, fn, on_result, on_error, on_cancel):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.runner = runner
+        self.owner = owner
+        self.fn = fn
+        self.on_result = on_result
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Drop the result; the query itself is abandoned if not yet started"""
+        if self.cancelled:
+            return
+        self._cancelled.set()
+        if self.runner.pool.tryTake(self):
+            self.runner._started.discard(self)
+        if self.on_cancel:
+            self.on_cancel()
+
+    def run(self):
+        if self.cancelled:
+            # Still report back so the runner drops its reference
+            self._report("job_finished", None)
+            return
+        try:
+            with session_scope(self.runner.engine) as session:
+                result = self.fn(session)
+        except Exception as error:
+            self._report("job_failed", error)
+        else:
+            self._report("job_finished", result)
+
+    def _report(self, signal, value):
+        try:
+            getattr(self.runner, signal).emit(self, value)
+        except RuntimeError:
+            # The runner was deleted while the application quit
+            pass
+
+class QueryRunner(QObject):
+    """Runs database queries on a thread pool and delivers results on the GUI thread.
+
+    Results arrive through queued signals. Submitting a new job for an
+    owner supersedes that owner's older jobs, so a stale result never
+    overwrites a newer one.
+    """
+    job_finished = pyqtSignal(object, object)
+    job_failed = pyqtSignal(object, object)
+
+    def __init__(self, engine, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.engine = engine
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._jobs = {}
+        # Started jobs stay referenced until they report back, even once
+        # cancelled, or Python would free them while the pool runs them
+        self._started = set()
+        self.job_finished.connect(self._deliver)
+        self.job_failed.connect(self._fail)
+
+    def submit(self, owner, fn, on_result=None, on_error=None, on_cancel=None):
+        """Run fn(session) off the GUI thread and pass its result to on_result"""
+        self.cancel(owner)
+        job = QueryJob(self, owner, fn, on_result, on_error, on_cancel)
+        self._jobs[id(owner)] = job
+        self._started.add(job)
+        self.pool.start(job)
+        return job
+
+    def cancel(self, owner):
+        """Cancel the pending job for owner; returns True if there was one"""
+        job = self._jobs.pop(id(owner), None)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def has_pending(self, owner):
+        return id(owner) in self._jobs
+
+    def _release(self, job):
+        self._started.discard(job)
+        if self._jobs.get(id(job.owner)) is job:
+            del self._jobs[id(job.owner)]
+            return True
+        return False
+
+    @pyqtSlot(object, object)
+    def _deliver(self, job, result):
+        if self._release(job) and not job.cancelled and job.on_result:
+            job.on_result(result)
+
+    @pyqtSlot(object, object)
+    def _fail(self, job, error):
+        if not self._release(job) or job.cancelled:
+            return
+        if job.on_error:
+            job.on_error(error)
+        else:
+            sys.excepthook(type(error), error, error.__traceback__)
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)
+
+    def shutdown(self, msecs=-1):
+        """Drop queued jobs and wait for running ones; call before the runner is deleted"""
+        self.pool.clear()
+        for job in list(self._started):
+            job._cancelled.set()
+        self._jobs.clear()
+        return self.wait(msecs)